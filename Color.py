@@ -48,4 +48,162 @@ CYAN = (0,255,255)
 MAGENTA = (255,0,255)
 NAVY = (0,0,128)
 PURPLE = (128,0,128)
-TEAL = (0,128,128)
\ No newline at end of file
+TEAL = (0,128,128)
+
+
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def toHex(color: tuple) -> str:
+    """ Return '#rrggbb' string for an RGB color """
+    return '#{:02x}{:02x}{:02x}'.format(*color[:3])
+
+def fromHex(hexString: str) -> tuple:
+    """ Return RGB tuple for '#rrggbb', 'rrggbb' or '#rgb' """
+    hexString = hexString.lstrip('#')
+    if len(hexString) == 3:
+        hexString = ''.join(char*2 for char in hexString)
+    return tuple(int(hexString[i:i+2], 16) for i in (0, 2, 4))
+
+def formatKey(surface) -> tuple:
+    """ Return hashable description of a surface pixel format """
+    return (surface.get_bitsize(), surface.get_masks(), surface.get_shifts(), surface.get_flags() & pygame.SRCALPHA)
+
+def lerp(a, b, t):
+    """
+    Linearly interpolate colors, works on tuples or elementwise on NumPy arrays of colors and t
+    """
+    if numpy is not None and any(isinstance(value, numpy.ndarray) for value in (a, b, t)):
+        a, b = numpy.asarray(a, dtype=numpy.float32), numpy.asarray(b, dtype=numpy.float32)
+        t = numpy.asarray(t, dtype=numpy.float32)
+        if t.ndim: t = t[..., None]
+        return numpy.rint(a + (b - a) * t).astype(numpy.uint8)
+    return tuple(round(x + (y - x) * t) for x, y in zip(a, b))
+
+def blend(source, destination, alpha):
+    """
+    Alpha blend source over destination (uint8 NumPy arrays of shape (..., 3)), alpha in [0, 255] scalar or array
+    """
+    source = numpy.asarray(source, dtype=numpy.uint16)
+    destination = numpy.asarray(destination, dtype=numpy.uint16)
+    alpha = numpy.asarray(alpha, dtype=numpy.uint16)
+    if alpha.ndim: alpha = alpha[..., None]
+    return ((source * alpha + destination * (255 - alpha) + 127) // 255).astype(numpy.uint8)
+
+def premultiply(rgba):
+    """
+    Return RGBA NumPy array with color channels multiplied by alpha
+    """
+    rgba = numpy.asarray(rgba, dtype=numpy.uint16)
+    result = rgba.copy()
+    result[..., :3] = (rgba[..., :3] * rgba[..., 3:4] + 127) // 255
+    return result.astype(numpy.uint8)
+
+
+class Gradient:
+    """ Precomputed lookup table of colors between stops, index it instead of computing colors per frame """
+    def __init__(self, stops: tuple, steps: int = 256) -> None:
+        self.stops = stops
+        self.steps = steps
+        positions = [index / (len(stops) - 1) for index in range(len(stops))]
+
+        if numpy is not None:
+            t = numpy.linspace(0, 1, steps)
+            self.array = numpy.stack([numpy.interp(t, positions, [stop[channel] for stop in stops]) for channel in range(3)], axis=1)
+            self.array = numpy.rint(self.array).astype(numpy.uint8)
+            self.colors = [tuple(color) for color in self.array.tolist()]
+        else:
+            self.array = None
+            self.colors = []
+            for step in range(steps):
+                t = step / (steps - 1) if steps > 1 else 0
+                segment = min(int(t * (len(stops) - 1)), len(stops) - 2)
+                local = t * (len(stops) - 1) - segment
+                self.colors.append(lerp(stops[segment], stops[segment + 1], local))
+        self.mappedColors = {}
+
+    def __getitem__(self, index: int) -> tuple:
+        return self.colors[index]
+
+    def __len__(self) -> int:
+        return self.steps
+
+    def at(self, t: float) -> tuple:
+        """ Return color at fraction t in [0, 1] """
+        return self.colors[round(min(max(t, 0), 1) * (self.steps - 1))]
+
+    def mapped(self, surface) -> list[int]:
+        """ Return table of colors mapped to surface pixel format, built once per format """
+        key = formatKey(surface)
+        table = self.mappedColors.get(key)
+        if table is None:
+            table = self.mappedColors[key] = [surface.map_rgb(color) for color in self.colors]
+        return table
+
+
+class Palette:
+    """
+    Indexed named colors with hex lookup and per pixel format caches of mapped colors and gradients
+    """
+    def __init__(self, colors: dict[str, tuple]) -> None:
+        self.byName = {}
+        self.byHex = {}
+        self.mappedColors = {}
+        self.gradients = {}
+        for name, color in colors.items():
+            self.add(name, color)
+
+    def add(self, name: str, color: tuple) -> None:
+        self.byName[name.upper()] = color
+        self.byHex.setdefault(toHex(color), name.upper())
+
+    def get(self, key: str) -> tuple:
+        """ Return RGB tuple for color name (any case) or hex string """
+        if key.startswith('#'):
+            return fromHex(key)
+        return self.byName[key.upper()]
+
+    def nameOf(self, color) -> str:
+        """ Return palette name of color (tuple or hex string), None if it is not in the palette """
+        return self.byHex.get(color.lower() if isinstance(color, str) else toHex(color))
+
+    def map(self, color, surface) -> int:
+        """
+        Return color (tuple, name or hex) mapped to surface pixel format, cached per format
+        """
+        if isinstance(color, str):
+            color = self.get(color)
+        key = (tuple(color), formatKey(surface))
+        mapped = self.mappedColors.get(key)
+        if mapped is None:
+            mapped = self.mappedColors[key] = surface.map_rgb(color)
+        return mapped
+
+    def gradient(self, *stops, steps: int = 256) -> Gradient:
+        """ Return cached gradient lookup table through stops (tuples, names or hex strings) """
+        stops = tuple(self.get(stop) if isinstance(stop, str) else tuple(stop) for stop in stops)
+        key = (stops, steps)
+        gradient = self.gradients.get(key)
+        if gradient is None:
+            gradient = self.gradients[key] = Gradient(stops, steps)
+        return gradient
+
+    def __getitem__(self, key: str) -> tuple:
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key.upper() in self.byName
+
+    def names(self) -> list[str]:
+        return list(self.byName)
+
+
+palette = Palette({name: value for name, value in globals().items() if name.isupper() and isinstance(value, tuple)})
+
+def mapColor(color, surface) -> int:
+    """ Return color mapped to surface pixel format from the shared palette cache """
+    return palette.map(color, surface)
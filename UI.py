@@ -1,8 +1,23 @@
 import pygame
 import Color
+import animation
+import prerender
+import renderpool
+import itertools
+import re
+import threading
+import weakref
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 
 from os import environ
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
 size = tuple[int, int]
@@ -12,11 +27,657 @@ ColorValue = tuple[float, float, float]
 
 screenColor = Color.BLACK
 
-class Label(pygame.sprite.Sprite):
-    """ Create text object centered at dest """
+FontKey = tuple[str, int, bool, bool]
+
+class FontRegistry:
+    """ Process-wide cache of SysFont objects keyed by (fontName, size, bold, italic) """
+    def __init__(self) -> None:
+        self.fonts = {}
+        self.advances = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def makeKey(fontName: str, size: int, bold: bool = False, italic: bool = False) -> FontKey:
+        """ Return normalized registry key for font settings """
+        return (fontName, int(size), bool(bold), bool(italic))
+
+    def getFont(self, fontName: str, size: int, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+        """
+        Return shared font for settings, only doing a system font lookup on first request
+        """
+        key = self.makeKey(fontName, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            self.misses += 1
+            with fontLock:
+                font = self.fonts[key] = pygame.font.SysFont(*key)
+        else:
+            self.hits += 1
+        return font
+
+    def measure(self, fontKey: FontKey, text: str) -> list[int]:
+        """
+        Return per-character advance widths of text, measuring each glyph only once per font
+        """
+        advances = self.advances.setdefault(fontKey, {})
+        missing = [char for char in set(text) if char not in advances]
+        if missing:
+            font = self.getFont(*fontKey)
+            for char, metric in zip(missing, font.metrics(''.join(missing))):
+                advances[char] = metric[4] if metric else font.size(char)[0]
+        return [advances[char] for char in text]
+
+    def clear(self) -> None:
+        """
+        Drop all cached fonts and reset counters (required after pygame.font.quit())
+        """
+        self.fonts.clear()
+        self.advances.clear()
+        self.resetStats()
+
+    def resetStats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {'fonts': len(self.fonts), 'hits': self.hits, 'misses': self.misses}
+
+fontRegistry = FontRegistry()
+
+def getFont(fontName: str, size: int, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+    """ Return font from the shared registry """
+    return fontRegistry.getFont(fontName, size, bold, italic)
+
+# font files are opened one at a time, worker threads never share Font objects with the main thread
+fontLock = threading.Lock()
+workerFonts = threading.local()
+
+def workerRender(fontKey: FontKey, text: str, color: ColorValue, antialias: bool = True, background: ColorValue = None) -> pygame.Surface:
+    """ Render text with fonts private to the calling thread, used in place of renderText off the main thread """
+    fonts = workerFonts.__dict__.setdefault('fonts', {})
+    font = fonts.get(fontKey)
+    if font is None:
+        with fontLock:
+            font = fonts[fontKey] = pygame.font.SysFont(*fontKey)
+    return rasterize(font, str(text), color, antialias, background)
+
+def visibilityPriority(rect: pygame.Rect) -> float:
+    """ Return render priority for rect, 0 when on screen and growing with distance from it """
+    display = pygame.display.get_surface()
+    if display is None:
+        return 0
+    screenRect = display.get_rect()
+    if screenRect.colliderect(rect):
+        return 0
+    return 1 + abs(rect.centerx - screenRect.centerx) + abs(rect.centery - screenRect.centery)
+
+# process-wide counters, read as deltas by profiling.Profiler
+surfaceAllocations = 0
+textRenders = 0
+
+def newSurface(size: size, flags: int = 0) -> pygame.Surface:
+    """ Return new surface, counting the allocation """
+    global surfaceAllocations
+    surfaceAllocations += 1
+    return pygame.Surface(size, flags)
+
+def copySurface(surface: pygame.Surface) -> pygame.Surface:
+    """ Return copy of surface, counting the allocation """
+    global surfaceAllocations
+    surfaceAllocations += 1
+    return surface.copy()
+
+def convertSurface(surface: pygame.Surface, alpha: bool = False) -> pygame.Surface:
+    """ Return copy of surface in the display format (with per-pixel alpha if alpha), counting the allocation """
+    global surfaceAllocations
+    surfaceAllocations += 1
+    return surface.convert_alpha() if alpha else surface.convert()
+
+def rasterize(font: pygame.font.Font, text: str, color: ColorValue, antialias: bool = True, background: ColorValue = None) -> pygame.Surface:
+    """ Render text without caching, counting the render """
+    global textRenders
+    textRenders += 1
+    return font.render(text, antialias, color, background)
+
+# blit formats from cheapest to most expensive, see imageFormat
+OPAQUE = 'opaque'
+COLORKEY = 'colorkey'
+ALPHA = 'alpha'
+KEY_COLORS = ((255, 0, 255), (0, 255, 255), (255, 255, 0), (1, 2, 3))
+
+def imageFormat(surface: pygame.Surface) -> str:
+    """
+    Return cheapest format that blits surface unchanged: OPAQUE when every pixel is opaque, COLORKEY when pixels
+    are only fully opaque or fully transparent, ALPHA otherwise. Without numpy per-pixel alpha is kept as is.
+    """
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return COLORKEY if surface.get_colorkey() is not None else OPAQUE
+    if numpy is None or not surface.get_width() or not surface.get_height():
+        return ALPHA
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    try:
+        if alpha.min() == 255:
+            return OPAQUE
+        return COLORKEY if numpy.all((alpha == 0) | (alpha == 255)) else ALPHA
+    finally:
+        del alpha
+
+def optimizeImage(surface: pygame.Surface, static: bool = True) -> pygame.Surface:
+    """
+    Return surface converted to the display format that blits it fastest. Only static images, which are never drawn
+    on again, become RLE accelerated colorkey surfaces, since drawing on a colorkey surface cannot restore transparency.
+    Per-pixel alpha is never RLE encoded because SDL blends RLE alpha slightly differently.
+    """
+    kind = imageFormat(surface)
+    if kind == OPAQUE:
+        return convertSurface(surface)
+    if kind == COLORKEY and static:
+        if not surface.get_flags() & pygame.SRCALPHA:
+            image = convertSurface(surface)
+            image.set_colorkey(surface.get_colorkey(), pygame.RLEACCEL)
+            return image
+        transparent = numpy.count_nonzero(pygame.surfarray.pixels_alpha(surface) == 0)
+        for key in KEY_COLORS:
+            image = convertSurface(newSurface(surface.get_size()))
+            image.fill(key)
+            image.blit(surface, (0, 0))
+            # the key must not also be the color of an opaque pixel
+            if numpy.count_nonzero(pygame.surfarray.pixels2d(image) == image.map_rgb(key)) == transparent:
+                image.set_colorkey(key, pygame.RLEACCEL)
+                return image
+    return convertSurface(surface, True)
+
+def copyPixels(target: pygame.Surface, source: pygame.Surface, dest: Coordinate, area: pygame.Rect = None) -> None:
+    """ Copy source pixels including alpha over target instead of blending them """
+    area = pygame.Rect(area) if area is not None else source.get_rect()
+    target.fill((0, 0, 0, 0), pygame.Rect(dest, area.size))
+    target.blit(source, dest, area, special_flags = pygame.BLEND_RGBA_ADD)
+
+# pointer position widgets fall back to when none is passed in, replay.Replayer swaps in the recorded one
+mouseSource = pygame.mouse.get_pos
+
+def getMousePos(mousePos: Coordinate = None) -> Coordinate:
+    """ Return mousePos if given, otherwise ask mouseSource (pygame by default) for the pointer position """
+    return mousePos if mousePos is not None else mouseSource()
+
+def freeze(value):
+    """ Return hashable form of a style value, lists become tuples """
+    if isinstance(value, (list, tuple, pygame.Color)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class Style:
+    """
+    Immutable, hashable bundle of widget settings. Style.get interns styles, so every widget
+    built with the same settings references one shared object instead of carrying its own copies.
+    """
+    __slots__ = ('fields', 'key', '__weakref__')
+    interned = weakref.WeakValueDictionary()
+
+    def __init__(self, **fields) -> None:
+        fields = {name: freeze(value) for name, value in fields.items()}
+        object.__setattr__(self, 'fields', fields)
+        object.__setattr__(self, 'key', tuple(sorted(fields.items(), key=lambda item: item[0])))
+
+    @classmethod
+    def get(cls, **fields) -> 'Style':
+        """ Return the shared style for fields, creating it on first use """
+        style = cls(**fields)
+        return cls.interned.setdefault(style.key, style)
+
+    @classmethod
+    def resolve(cls, defaults: dict, kwargs: dict, **fields) -> 'Style':
+        """
+        Return shared style from widget defaults overridden by a style= keyword and then by keyword arguments
+        """
+        base = kwargs.get('style')
+        values = {attr: kwargs.get(attr, base.fields.get(attr, default) if base else default) for attr, default in defaults.items()}
+        values.update(fields)
+        return cls.get(**values)
+
+    def replace(self, **changes) -> 'Style':
+        return Style.get(**{**self.fields, **changes})
+
+    def __getattr__(self, name: str):
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise AttributeError(f"style has no setting '{name}'") from None
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError('Style is immutable, use replace()')
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Style) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f'Style({", ".join(f"{name}={value!r}" for name, value in self.key)})'
+
+class Styled:
+    """ Widget mixin reading settings that are not set on the instance from its shared style """
+    def __getattr__(self, name: str):
+        if name == 'style':
+            raise AttributeError(name)
+        return getattr(self.style, name)
+
+def moveWidget(widget: pygame.sprite.Sprite, topleft: Coordinate) -> bool:
+    """
+    Move widget so its rect starts at topleft without re-rendering it, return true if it moved.
+    Anchors widgets keep besides rect (dest, centerX/centerY) are shifted by the same offset.
+    """
+    dx, dy = round(topleft[0]) - widget.rect.x, round(topleft[1]) - widget.rect.y
+    if not dx and not dy:
+        return False
+    widget.rect.move_ip(dx, dy)
+    if getattr(widget, 'dest', None) is not None:
+        widget.dest = type(widget.dest)((widget.dest[0] + dx, widget.dest[1] + dy))
+    if hasattr(widget, 'centerX'):
+        widget.centerX += dx
+        widget.centerY += dy
+    widget.dirty = True
+    return True
+
+def colorKey(color) -> tuple:
+    """ Return hashable form of a color value (lists and pygame.Color become tuples) """
+    if isinstance(color, (list, tuple, pygame.Color)):
+        return tuple(color)
+    return color
+
+class TextCache:
+    """ Bounded LRU cache of rendered text surfaces keyed by (font key, text, color, antialias, background) """
+    def __init__(self, maxBytes: int = 8 * 1024 * 1024) -> None:
+        self.maxBytes = maxBytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, fontKey: FontKey, text: str, color: ColorValue, antialias: bool = True, background: ColorValue = None) -> pygame.Surface:
+        """
+        Return rendered text surface, rasterizing only on a cache miss.
+        Returned surfaces are shared and must not be drawn on.
+        """
+        key = (fontKey, str(text), colorKey(color), bool(antialias), colorKey(background))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        return self.store(key, rasterize(fontRegistry.getFont(*fontKey), key[1], key[2], key[3], key[4]))
+
+    def composite(self, key: tuple, build) -> pygame.Surface:
+        """
+        Return surface for key, calling build() only on a cache miss. For composed text images such as
+        slider hover tags, which then share the text memory budget. Returned surfaces must not be drawn on.
+        """
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        return self.store(key, build())
+
+    def store(self, key: tuple, surface: pygame.Surface) -> pygame.Surface:
+        surfaceBytes = self.surfaceBytes(surface)
+        if surfaceBytes > self.maxBytes:
+            return surface
+
+        self.surfaces[key] = surface
+        self.bytes += surfaceBytes
+        self.evict()
+        return surface
+
+    @staticmethod
+    def surfaceBytes(surface: pygame.Surface) -> int:
+        return surface.get_pitch() * surface.get_height()
+
+    def evict(self) -> None:
+        """
+        Drop least recently used surfaces until cache fits in memory budget
+        """
+        while self.bytes > self.maxBytes and self.surfaces:
+            _, surface = self.surfaces.popitem(last=False)
+            self.bytes -= self.surfaceBytes(surface)
+            self.evictions += 1
+
+    def setBudget(self, maxBytes: int) -> None:
+        self.maxBytes = maxBytes
+        self.evict()
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+        self.bytes = 0
+        self.resetStats()
+
+    def resetStats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        return {'surfaces': len(self.surfaces), 'bytes': self.bytes, 'maxBytes': self.maxBytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+textCache = TextCache()
+
+def renderText(fontKey: FontKey, text: str, color: ColorValue, antialias: bool = True, background: ColorValue = None) -> pygame.Surface:
+    """ Return text surface from the shared text cache """
+    return textCache.render(fontKey, text, color, antialias, background)
+
+def renderUncached(fontKey: FontKey, text: str, color: ColorValue, antialias: bool = True, background: ColorValue = None) -> pygame.Surface:
+    """ Return text surface rendered with a shared font but kept out of the text cache, for one-off text """
+    return rasterize(fontRegistry.getFont(*fontKey), str(text), color, antialias, background)
+
+class WrapCache:
+    """
+    Bounded LRU cache of word wrapped paragraphs keyed by (font key, paragraph, width). Line breaks come from
+    cached glyph advances, so nothing is rendered to find them, and paragraphs shared between texts
+    (e.g. a chat log before and after a message) are wrapped only once.
+    """
+    wordPattern = re.compile(r'\S+\s*|\s+')
+
+    def __init__(self, maxEntries: int = 4096) -> None:
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, fontKey: FontKey, text: str, width: int) -> list[str]:
+        """ Return lines of text broken at spaces and newlines to fit width """
+        return [line for paragraph in str(text).split('\n') for line in self.wrapParagraph(fontKey, paragraph, width)]
+
+    def wrapParagraph(self, fontKey: FontKey, paragraph: str, width: int) -> tuple[str, ...]:
+        """
+        Return lines of a paragraph without newlines, words wider than width are broken between characters
+        """
+        key = (fontKey, paragraph, int(width))
+        lines = self.entries.get(key)
+        if lines is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return lines
+        self.misses += 1
+        lines = self.entries[key] = self.breakLines(fontKey, paragraph, int(width))
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+        return lines
+
+    def breakLines(self, fontKey: FontKey, paragraph: str, width: int) -> tuple[str, ...]:
+        """
+        Greedily fill lines from cached advances, confirming each line with a single measurement since
+        advances ignore kerning and sub-pixel positioning
+        """
+        font = fontRegistry.getFont(*fontKey)
+        prefix = [0, *itertools.accumulate(fontRegistry.measure(fontKey, paragraph))]
+        spans = [match.span() for match in self.wordPattern.finditer(paragraph)]
+        # trailing spaces may hang past the edge, they are stripped when rendered
+        visible = [wordStart + len(paragraph[wordStart:wordEnd].rstrip()) for wordStart, wordEnd in spans]
+        lines = []
+        start = index = 0
+        while index < len(spans):
+            end = index
+            while end < len(spans) and prefix[visible[end]] - prefix[start] <= width:
+                end += 1
+            while end > index and font.size(paragraph[start:visible[end - 1]])[0] > width:
+                end -= 1
+            if end == len(spans):
+                break
+            if end > index:
+                lines.append(paragraph[start:spans[end][0]].rstrip())
+                start, index = spans[end][0], end
+                continue
+            # word wider than a whole line, break it between characters
+            cut = min(visible[index], max(start + 1, bisect_right(prefix, prefix[start] + width, start + 1) - 1))
+            while cut > start + 1 and font.size(paragraph[start:cut])[0] > width:
+                cut -= 1
+            lines.append(paragraph[start:cut])
+            start = cut
+        lines.append(paragraph[start:].rstrip())
+        return tuple(lines)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.resetStats()
+
+    def resetStats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {'entries': len(self.entries), 'maxEntries': self.maxEntries, 'hits': self.hits, 'misses': self.misses}
+
+wrapCache = WrapCache()
+
+class SurfacePool:
+    """
+    Free lists of display-format scratch surfaces keyed by (size, alpha).
+    Idle surfaces are kept up to maxBytes, releases past that limit are dropped.
+    """
+    def __init__(self, maxBytes: int = 16 * 1024 * 1024) -> None:
+        self.maxBytes = maxBytes
+        self.free = {}
+        self.bytes = 0
+        self.highWater = 0
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+        self.drops = 0
+
+    @staticmethod
+    def keyOf(surface: pygame.Surface) -> tuple:
+        return (surface.get_size(), bool(surface.get_flags() & pygame.SRCALPHA))
+
+    def acquire(self, size: size, alpha: bool = True, fill: ColorValue = None) -> pygame.Surface:
+        """
+        Return surface of size from the pool, allocating only when none is idle.
+        Alpha surfaces are cleared to transparent, opaque ones are filled only if fill is given.
+        """
+        key = ((int(size[0]), int(size[1])), alpha)
+        free = self.free.get(key)
+        if free:
+            self.hits += 1
+            surface = free.pop()
+            self.bytes -= TextCache.surfaceBytes(surface)
+            if alpha:
+                surface.fill((0,0,0,0))
+        else:
+            self.misses += 1
+            surface = newSurface(key[0], pygame.SRCALPHA if alpha else 0)
+            surface = convertSurface(surface, alpha)
+        if fill is not None:
+            surface.fill(fill)
+        return surface
+
+    def copy(self, surface: pygame.Surface) -> pygame.Surface:
+        """ Return pooled surface holding a copy of surface """
+        size, alpha = self.keyOf(surface)
+        target = self.acquire(size, alpha)
+        target.blit(surface, (0, 0), special_flags = pygame.BLEND_RGBA_ADD if alpha else 0)
+        return target
+
+    def release(self, surface: pygame.Surface) -> None:
+        """
+        Return surface obtained from acquire or copy, the caller must not draw on it afterwards
+        """
+        self.releases += 1
+        surfaceBytes = TextCache.surfaceBytes(surface)
+        if self.bytes + surfaceBytes > self.maxBytes:
+            self.drops += 1
+            return
+        self.free.setdefault(self.keyOf(surface), []).append(surface)
+        self.bytes += surfaceBytes
+        self.highWater = max(self.highWater, self.bytes)
+
+    def trim(self, maxBytes: int = None) -> None:
+        """
+        Drop idle surfaces until pool fits in maxBytes (the pool limit by default)
+        """
+        maxBytes = self.maxBytes if maxBytes is None else maxBytes
+        for free in self.free.values():
+            while free and self.bytes > maxBytes:
+                self.bytes -= TextCache.surfaceBytes(free.pop())
+        self.free = {key: free for key, free in self.free.items() if free}
+
+    def setLimit(self, maxBytes: int) -> None:
+        self.maxBytes = maxBytes
+        self.trim()
+
+    def clear(self) -> None:
+        """ Drop every idle surface, e.g. after the display format changed """
+        self.free.clear()
+        self.bytes = 0
+        self.resetStats()
+
+    def resetStats(self) -> None:
+        self.highWater = self.bytes
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+        self.drops = 0
+
+    def stats(self) -> dict:
+        return {'idle': sum(len(free) for free in self.free.values()), 'bytes': self.bytes, 'highWater': self.highWater,
+                'maxBytes': self.maxBytes, 'hits': self.hits, 'misses': self.misses, 'releases': self.releases, 'drops': self.drops}
+
+surfacePool = SurfacePool()
+
+class ShapeCache:
+    """
+    Bounded LRU cache of rasterized rounded rects keyed by (width, height, color, border width, radius).
+    Shapes are stored as RLE colorkey surfaces: pygame.draw does not antialias, so a shape is exactly its opaque
+    pixels and blitting it copies runs instead of rasterizing corners again. Building a cached shape costs several
+    draws, so drawRoundedRect draws directly and only counts a shape until it has been drawn admitAfter times:
+    sizes used a few times cost what pygame.draw does and don't take up the memory budget.
+    entries maps each key to its draw count or its surface, so a draw costs one lookup either way.
+    """
+    # count stored for shapes pygame.draw must keep drawing, far enough below zero to never reach admitAfter
+    UNCACHEABLE = -2**62
+
+    def __init__(self, maxBytes: int = 4 * 1024 * 1024, admitAfter: int = 4, maxSeen: int = 4096) -> None:
+        self.maxBytes = maxBytes
+        self.admitAfter = admitAfter
+        self.maxSeen = maxSeen
+        self.entries = {}
+        self.shapes = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.rasterized = 0
+        # render workers build Labels too
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def keyColorFor(color: ColorValue) -> tuple:
+        return (0, 255, 255) if tuple(color[:3]) == (255, 0, 255) else (255, 0, 255)
+
+    def forgetCounts(self) -> None:
+        """ Drop the draw counts of shapes not cached yet, called once maxSeen shapes are counted """
+        with self.lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if entry.__class__ is not int}
+
+    def build(self, key: tuple) -> pygame.Surface | None:
+        """
+        Rasterize and store the shape for key, return None for shapes pygame.draw must keep drawing:
+        translucent colors, and borders wider than half the rect, which pygame draws outside of it
+        """
+        width, height, color, border, radius = key
+        if (len(color) == 4 and color[3] != 255) or 2*border > min(width, height):
+            self.entries[key] = self.UNCACHEABLE
+            return None
+        with self.lock:
+            # another thread may have built it meanwhile
+            if key in self.shapes:
+                return self.shapes[key]
+            surface = newSurface((width, height))
+            surface.fill(self.keyColorFor(color))
+            pygame.draw.rect(surface, color, surface.get_rect(), border, radius)
+            surface.set_colorkey(self.keyColorFor(color), pygame.RLEACCEL)
+            self.rasterized += 1
+            self.shapes[key] = self.entries[key] = surface
+            self.bytes += TextCache.surfaceBytes(surface)
+            while self.bytes > self.maxBytes and len(self.shapes) > 1:
+                evictedKey, evicted = self.shapes.popitem(last=False)
+                self.entries.pop(evictedKey, None)
+                self.bytes -= TextCache.surfaceBytes(evicted)
+        return surface
+
+    def touch(self, key: tuple) -> None:
+        with self.lock:
+            self.hits += 1
+            if key in self.shapes: self.shapes.move_to_end(key)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.shapes.clear()
+        self.bytes = 0
+        self.resetStats()
+
+    def resetStats(self) -> None:
+        self.hits = 0
+        self.rasterized = 0
+
+    def stats(self) -> dict:
+        return {'shapes': len(self.shapes), 'counted': len(self.entries) - len(self.shapes), 'bytes': self.bytes,
+                'maxBytes': self.maxBytes, 'hits': self.hits, 'rasterized': self.rasterized}
+
+shapeCache = ShapeCache()
+
+def drawRoundedRect(surface: pygame.Surface, color: ColorValue, rect: pygame.Rect, width: int = 0, radius: int = -1) -> pygame.Rect:
+    """
+    Draw what pygame.draw.rect would, blitting the shape from shapeCache once it has been drawn often enough.
+    Only tuple colors are cached, square corners are plain fills already
+    """
+    if radius > 0 and color.__class__ is tuple:
+        key = (rect[2], rect[3], color, width, radius)
+        entries = shapeCache.entries
+        entry = entries.get(key, 0)
+        if entry.__class__ is not int:
+            shapeCache.touch(key)
+            return surface.blit(entry, rect)
+        if entry + 1 >= shapeCache.admitAfter:
+            entry = shapeCache.build(key)
+            if entry is not None:
+                return surface.blit(entry, rect)
+        else:
+            if entry == 0 and len(entries) >= shapeCache.maxSeen + len(shapeCache.shapes):
+                shapeCache.forgetCounts()
+                entries = shapeCache.entries
+            # counting needs no lock, a lost count only delays caching a shape by one draw
+            entries[key] = entry + 1
+    return pygame.draw.rect(surface, color, rect, width, radius)
+
+def recycle(sprite: pygame.sprite.Sprite) -> None:
+    """
+    Return pooled buffers of a discarded widget to the surface pool, the widget must not be drawn again.
+    DirtyGroup.discard calls it for widgets it removes
+    """
+    for surface in getattr(sprite, 'rowSlots', {}).values():
+        surfacePool.release(surface)
+    for surface in getattr(sprite, 'rowCache', {}).values():
+        surfacePool.release(surface)
+    if getattr(sprite, 'image', None) is not None and sprite.image is not getattr(sprite, 'original_image', None):
+        surfacePool.release(sprite.image)
+    sprite.image = None
+
+class Label(Styled, pygame.sprite.Sprite):
+    """
+    Create text object centered at dest. With wrapWidth the text is word wrapped into lines of at most
+    wrapWidth pixels, and setText re-renders only the lines that changed.
+    """
+    eventRouting = True
+    ready = None
+    destOrientation = 'center'
+
     def __init__(self, dest: Coordinate, textString: str, textColor: ColorValue, textSize: int, **kwargs) -> None:
         super().__init__()
-        self.__dict__.update(locals())
         defaults = {
             'fontName' : 'Arial',
             'drawBorders' : False,
@@ -28,55 +689,191 @@ class Label(pygame.sprite.Sprite):
             'backgroundColor' : screenColor,
             'margin' : [0,0],
             'transparent' : True,
-            'destOrientation' : 'center',
+            'wrapWidth' : None,
         }
 
-        for attr, default in defaults.items():
-            setattr(self, attr, kwargs.get(attr, default))
-        
-        font = pygame.font.SysFont(self.fontName, textSize, self.bold, self.italic)
-        text = font.render(str(textString), True, textColor)
+        # settings live in a shared style, only per-label state is stored on the instance
+        self.style = Style.resolve(defaults, kwargs, textColor=textColor, textSize=textSize)
+        self.textString = textString
+        self.fontKey = FontRegistry.makeKey(self.fontName, textSize, self.bold, self.italic)
+        if 'destOrientation' in kwargs: self.destOrientation = kwargs['destOrientation']
+        if self.wrapWidth:
+            # line breaks are found on the main thread, workers only rasterize the lines
+            self.lineHeight = getFont(*self.fontKey).get_linesize()
+            self.paragraphs = str(textString).split('\n')
+            self.paragraphLines = [wrapCache.wrapParagraph(self.fontKey, paragraph, self.wrapWidth) for paragraph in self.paragraphs]
+        deferred = kwargs.get('deferred', False)
+        cacheKey = prerender.cache.keyFor('Label', dict(self.style.fields, textString=textString), [self.fontKey])
+        cached = prerender.cache.load(cacheKey)
+        if cached:
+            self.original_image = self.finishImage(cached[0])
+        elif deferred:
+            # measured transparent placeholder, swapped for the real image once a worker rendered it
+            measured = self.textBlockSize() if self.wrapWidth else getFont(*self.fontKey).size(str(textString))
+            self.original_image = convertSurface(newSurface(pygame.Rect((0, 0), measured).inflate(self.margin).size, pygame.SRCALPHA), True)
+        else:
+            image = self.renderImage()
+            prerender.cache.store(cacheKey, [image])
+            self.original_image = self.finishImage(image)
+
+        # labels never draw on their image, so it is the rendered surface itself rather than a copy
+        self.image = self.original_image
+        self.rect = self.image.get_rect(**{self.destOrientation: dest})
+
+        if deferred and not cached:
+            priority = kwargs.get('priority')
+            priority = priority if priority is not None else visibilityPriority(self.rect)
+            # a setText before the worker finished wins over the stale render
+            self.ready = renderpool.pool.submit(lambda: self.renderImage(workerRender),
+                                                lambda image: self.swapImage(image, cacheKey) if self.textString is textString else self, priority)
+        self.dirty = True
+
+    def renderImage(self, render = renderText) -> pygame.Surface:
+        """ Rasterize label text with its background and borders, render may be workerRender off the main thread """
+        if self.wrapWidth:
+            # wrapped lines are rarely shared, so they bypass the text cache instead of flooding it
+            text = self.renderLines(self.wrappedLines(), renderUncached if render is renderText else render)
+        else:
+            text = render(self.fontKey, self.textString, self.textColor)
         textRect = text.get_rect()
 
-        self.original_image = pygame.Surface(textRect.inflate(self.margin).size, pygame.SRCALPHA).convert_alpha()
-        if not self.transparent: self.original_image.fill(self.backgroundColor)
-        
+        image = newSurface(textRect.inflate(self.margin).size, pygame.SRCALPHA)
+        if not self.transparent: image.fill(self.backgroundColor)
+
         if self.textBackgroundColor:
-            pygame.draw.rect(self.original_image, self.textBackgroundColor, self.original_image.get_rect(), self.textBackgroundWidth, self.textBackgroundRounded)
+            drawRoundedRect(image, self.textBackgroundColor, image.get_rect(), self.textBackgroundWidth, self.textBackgroundRounded)
 
-        textRect.center = self.original_image.get_rect().center
-        self.original_image.blit(text, textRect)
+        textRect.center = image.get_rect().center
+        image.blit(text, textRect)
 
         if self.drawBorders:
-            pygame.draw.rect(self.original_image, Color.RED, textRect, 2)
-            pygame.draw.rect(self.original_image, Color.CYAN, self.original_image.get_rect(), 2)
-
-        self.image = self.original_image.copy()
-        if self.destOrientation == 'topleft':
-            self.rect = self.image.get_rect(topleft = dest)
-        if self.destOrientation == 'midtop':
-            self.rect = self.image.get_rect(midtop = dest)
-        if self.destOrientation == 'topright':
-            self.rect = self.image.get_rect(topright = dest)
-        if self.destOrientation == 'midleft':
-            self.rect = self.image.get_rect(midleft = dest)
-        if self.destOrientation == 'center':
-            self.rect = self.image.get_rect(center = dest)
-        if self.destOrientation == 'midright':
-            self.rect = self.image.get_rect(midright = dest)
-        if self.destOrientation == 'bottomleft':
-            self.rect = self.image.get_rect(bottomleft = dest)
-        if self.destOrientation == 'midbottom':
-            self.rect = self.image.get_rect(midbottom = dest)
-        if self.destOrientation == 'bottomright':
-            self.rect = self.image.get_rect(bottomright = dest)
-
-class InputField(pygame.sprite.Sprite):
+            pygame.draw.rect(image, Color.RED, textRect, 2)
+            pygame.draw.rect(image, Color.CYAN, image.get_rect(), 2)
+        return image
+
+    def finishImage(self, image: pygame.Surface) -> pygame.Surface:
+        """ Return rendered image in its blit format, wrapped labels keep per-pixel alpha since setText draws into them """
+        return convertSurface(image, True) if self.wrapWidth else optimizeImage(image)
+
+    def wrappedLines(self) -> list[str]:
+        return [line for lines in self.paragraphLines for line in lines]
+
+    def textBlockSize(self, lineCount: int = None) -> size:
+        """ Return size of the wrapped text block, which is always wrapWidth wide """
+        lineCount = sum(map(len, self.paragraphLines)) if lineCount is None else lineCount
+        return (self.wrapWidth, lineCount * self.lineHeight)
+
+    def renderLines(self, lines: list[str], render = renderUncached) -> pygame.Surface:
+        """
+        Rasterize wrapped lines top to bottom into one transparent block, each clipped to its own row
+        so a line can be replaced without touching its neighbours
+        """
+        lineArea = (0, 0, self.wrapWidth, self.lineHeight)
+        block = newSurface((self.wrapWidth, len(lines) * self.lineHeight), pygame.SRCALPHA)
+        block.blits([(render(self.fontKey, line, self.textColor), (0, index * self.lineHeight), lineArea) for index, line in enumerate(lines) if line], doreturn=False)
+        return block
+
+    def textOrigin(self, textSize: size) -> tuple[int, int]:
+        """ Return where renderImage places a text block of textSize inside the label image """
+        imageWidth, imageHeight = pygame.Rect((0, 0), textSize).inflate(self.margin).size
+        textRect = pygame.Rect((0, 0), textSize)
+        textRect.center = (imageWidth // 2, imageHeight // 2)
+        return textRect.topleft
+
+    def setText(self, textString: str) -> None:
+        """
+        Show textString, keeping the label anchored at its destOrientation point.
+        Wrapped labels re-wrap only the paragraphs that changed and re-render only the lines that differ,
+        lines above and below the edit are copied from the current image.
+        """
+        if textString == self.textString:
+            return
+        self.textString = textString
+        anchor = getattr(self.rect, self.destOrientation)
+        if not self.wrapWidth:
+            self.original_image = self.image = self.finishImage(self.renderImage())
+        else:
+            self.rewrap(str(textString).split('\n'))
+        self.rect = self.image.get_rect(**{self.destOrientation: anchor})
+        self.dirty = True
+
+    def rewrap(self, paragraphs: list[str]) -> None:
+        """
+        Update wrapped image for new paragraphs, reusing the lines of the common head and tail
+        """
+        oldParagraphs, oldLines = self.paragraphs, self.paragraphLines
+        first, common = 0, min(len(paragraphs), len(oldParagraphs))
+        while first < common and paragraphs[first] == oldParagraphs[first]:
+            first += 1
+        last = 0
+        while last < common - first and paragraphs[-1 - last] == oldParagraphs[-1 - last]:
+            last += 1
+
+        middle = [wrapCache.wrapParagraph(self.fontKey, paragraph, self.wrapWidth) for paragraph in paragraphs[first:len(paragraphs) - last]]
+        self.paragraphs = paragraphs
+        self.paragraphLines = oldLines[:first] + middle + oldLines[len(oldLines) - last:]
+
+        # narrow the changed paragraphs down to the lines that actually differ, e.g. a message appended to a log
+        oldMiddle = [line for lines in oldLines[first:len(oldLines) - last] for line in lines]
+        newMiddle = [line for lines in middle for line in lines]
+        head = sum(map(len, oldLines[:first]))
+        tail = sum(map(len, oldLines[len(oldLines) - last:]))
+        same, common = 0, min(len(oldMiddle), len(newMiddle))
+        while same < common and oldMiddle[same] == newMiddle[same]:
+            same += 1
+        sameTail = 0
+        while sameTail < common - same and oldMiddle[-1 - sameTail] == newMiddle[-1 - sameTail]:
+            sameTail += 1
+        head += same
+        tail += sameTail
+        changed = newMiddle[same:len(newMiddle) - sameTail]
+
+        oldCount = head + len(oldMiddle) - same - sameTail + tail
+        newCount = head + len(changed) + tail
+        oldOrigin, origin = self.textOrigin(self.textBlockSize(oldCount)), self.textOrigin(self.textBlockSize(newCount))
+        if self.textBackgroundColor or self.drawBorders or oldOrigin != origin:
+            # decorations span the whole image, so they are drawn again from scratch
+            self.original_image = self.image = convertSurface(self.renderImage(), True)
+            return
+
+        lineHeight = self.lineHeight
+        width = self.image.get_width()
+        height = pygame.Rect((0, 0), self.textBlockSize(newCount)).inflate(self.margin).height
+        oldTail = pygame.Rect(0, oldOrigin[1] + (oldCount - tail) * lineHeight, width, 0)
+        oldTail.height = self.image.get_height() - oldTail.y
+        newTailTop = origin[1] + (newCount - tail) * lineHeight
+
+        # the image is a view into a taller canvas, so growing logs rarely reallocate
+        canvas = self.image.get_parent() or self.image
+        if height > canvas.get_height():
+            grown = newSurface((width, height + height // 2), pygame.SRCALPHA)
+            copyPixels(grown, self.image, (0, 0), (0, 0, width, origin[1] + head * lineHeight))
+            copyPixels(grown, self.image, (0, newTailTop), oldTail)
+            canvas = grown
+        elif newTailTop != oldTail.y and oldTail.height:
+            copyPixels(canvas, copySurface(self.image.subsurface(oldTail)), (0, newTailTop))
+
+        changedRect = pygame.Rect(0, origin[1] + head * lineHeight, width, len(changed) * lineHeight)
+        canvas.fill((0, 0, 0, 0) if self.transparent else self.backgroundColor, changedRect)
+        changedRect.x = origin[0]
+        canvas.blit(self.renderLines(changed), changedRect)
+        self.original_image = self.image = canvas.subsurface((0, 0, width, height))
+
+    def swapImage(self, image: pygame.Surface, cacheKey: str = None) -> 'Label':
+        """ Replace placeholder with image rendered by a worker, on the main thread """
+        prerender.cache.store(cacheKey, [image])
+        self.original_image = self.image = self.finishImage(image)
+        self.dirty = True
+        return self
+
+class InputField(Styled, pygame.sprite.Sprite):
     """ Create input field centered at dest with label """
+    eventRouting = True
+    takesFocus = True
+
     def __init__(self, dest: Coordinate, label: str, labelColor: ColorValue, labelSize: int, 
                  inputTextColor: ColorValue, inputTextSize: str, inputWidth: size = [0,0], **kwargs) -> None:
         super().__init__()
-        self.__dict__.update(locals())
         defaults = {
             'fontName' : 'Arial',
             'drawBorders' : False,
@@ -95,21 +892,28 @@ class InputField(pygame.sprite.Sprite):
             'inputBackgroundRounded' : False,
             'inputBackgroundWidth' : 1,
             'inputMargin' : [0,0],
-            'backgroundColor' : screenColor
+            'backgroundColor' : screenColor,
+            'selectionColor' : Color.NAVY,
         }
 
-        for attr, default in defaults.items():
-            setattr(self, attr, kwargs.get(attr, default))
+        self.style = Style.resolve(defaults, kwargs, inputTextColor=inputTextColor, inputWidth=inputWidth)
 
         self.inputString = ''
         self.clicked = False
 
-        font = pygame.font.SysFont(self.fontName, labelSize, self.bold or self.labelBold, self.italic or self.labelItalic)
-        self.title = font.render(label, True, labelColor)
+        # editing state: caret/selection are character indexes, glyphPrefix[i] is pixel width of the first i characters
+        self.caret = 0
+        self.selectionAnchor = None
+        self.scrollX = 0
+        self.glyphPrefix = self.emptyPrefix()
+
+        labelFontKey = FontRegistry.makeKey(self.fontName, labelSize, self.bold or self.labelBold, self.italic or self.labelItalic)
+        self.title = renderText(labelFontKey, label, labelColor)
         self.titleRect = self.title.get_rect()
 
-        self.inputFont = pygame.font.SysFont(self.fontName, inputTextSize, self.bold or self.inputBold, self.italic or self.inputItalic)
-        self.inputPlaceholder = self.inputFont.render(self.placeHolderText, True, self.placeHolderColor)
+        self.inputFontKey = FontRegistry.makeKey(self.fontName, inputTextSize, self.bold or self.inputBold, self.italic or self.inputItalic)
+        self.inputFont = getFont(*self.inputFontKey)
+        self.inputPlaceholder = renderText(self.inputFontKey, self.placeHolderText, self.placeHolderColor)
         self.inputPlaceholderRect = self.inputPlaceholder.get_rect()
 
         inputRectMargin = self.inputPlaceholderRect.inflate(self.inputMargin[0]*2, self.inputMargin[1]*2)
@@ -118,7 +922,7 @@ class InputField(pygame.sprite.Sprite):
         self.inputBar = inputRectMargin.union(inputRectWidth)
 
         surfaceRect = pygame.Rect(0,0, max(self.inputBar.width, self.titleRect.width), self.inputBar.height + self.titleRect.height)
-        self.original_image = pygame.Surface(surfaceRect.size, pygame.SRCALPHA).convert_alpha()
+        self.original_image = convertSurface(newSurface(surfaceRect.size, pygame.SRCALPHA), True)
         self.original_image.fill(self.backgroundColor)
 
         self.titleRect.centery = 0 + self.titleRect.height//2
@@ -132,67 +936,205 @@ class InputField(pygame.sprite.Sprite):
         self.inputPlaceholderRect.center = self.inputBar.center
 
         if self.inputBackgroundColor:
-            pygame.draw.rect(self.original_image, self.inputBackgroundColor, self.inputBar, self.inputBackgroundWidth, self.inputBackgroundRounded)
+            drawRoundedRect(self.original_image, self.inputBackgroundColor, self.inputBar, self.inputBackgroundWidth, self.inputBackgroundRounded)
+
+        self.barBackground = optimizeImage(self.original_image.subsurface(self.inputBar), static=False)
+        self.textArea = self.inputBar.inflate(-self.inputMargin[0]*2, 0)
+        self.textArea.width = max(1, self.textArea.width)
+        self.inputText = None
+        self.inputRect = self.inputPlaceholderRect.copy()
 
         self.original_image.blits([(self.title, self.titleRect), (self.inputPlaceholder, self.inputPlaceholderRect)])
 
         if self.drawBorders: self.drawOutlines(self.original_image)
 
-        self.image = self.original_image.copy()
+        # the image is drawn on every keystroke, so it stays opaque or alpha but never colorkey
+        self.original_image = optimizeImage(self.original_image, static=False)
+        self.image = surfacePool.copy(self.original_image)
         self.rect = self.image.get_rect(center = dest)
+        self.dirty = True
 
     def update(self, event_list: list[pygame.event.Event], **kwargs) -> None:
+        previousState = (self.inputString, self.caret, self.selectionAnchor, self.clicked)
         for event in event_list:
             if event.type == pygame.MOUSEBUTTONDOWN:
-                self.clicked = self.checkSelect()
+                self.clicked = self.checkSelect(event.pos)
+                if self.clicked:
+                    self.caret = self.caretFromPos(event.pos)
+                    self.selectionAnchor = None
 
             if self.clicked and event.type == pygame.KEYDOWN:
-                if event.key in [pygame.K_RETURN, pygame.K_TAB, pygame.K_ESCAPE]:
-                    continue
-                if event.key == pygame.K_BACKSPACE:
-                    self.inputString = '' if len(self.inputString) <= 1 else self.inputString[:-1]
-                elif len(self.inputString) < self.inputMaxLength:
-                    self.inputString += event.unicode
+                self.handleKey(event)
 
-        if self.inputString == '':
-            self.image = self.original_image.copy()
-            self.rect = self.image.get_rect(center = self.dest)
+        if (self.inputString, self.caret, self.selectionAnchor, self.clicked) == previousState:
             return
-        
-        self.inputFont = pygame.font.SysFont(self.fontName, self.inputTextSize, self.bold or self.inputBold, self.italic or self.inputItalic)
-        self.inputText = self.inputFont.render(self.inputString, True, self.inputTextColor)
-        self.inputRect = self.inputText.get_rect()
-
-        if self.inputBar.width - self.inputRect.width < self.inputMargin[0]*2:
-            self.inputString = self.inputString[:-1]
-            self.inputFont = pygame.font.SysFont(self.fontName, self.inputTextSize, self.bold, self.italic)
-            self.inputText = self.inputFont.render(self.inputString, True, self.inputTextColor)
-            self.inputRect = self.inputText.get_rect()
+
+        self.scrollToCaret()
+        self.renderInput()
+
+    def handleKey(self, event: pygame.event.Event) -> None:
+        """
+        Apply a single KEYDOWN to the text, caret and selection
+        """
+        mod = getattr(event, 'mod', 0)
+        shift = mod & pygame.KMOD_SHIFT
+        if event.key in [pygame.K_RETURN, pygame.K_TAB, pygame.K_ESCAPE]:
+            return
+        if event.key == pygame.K_a and mod & pygame.KMOD_CTRL:
+            self.selectionAnchor, self.caret = 0, len(self.inputString)
+        elif event.key == pygame.K_BACKSPACE:
+            if not self.deleteSelection() and self.caret > 0:
+                self.deleteRange(self.caret - 1, self.caret)
+        elif event.key == pygame.K_DELETE:
+            if not self.deleteSelection() and self.caret < len(self.inputString):
+                self.deleteRange(self.caret, self.caret + 1)
+        elif event.key in [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_HOME, pygame.K_END]:
+            if shift and self.selectionAnchor is None:
+                self.selectionAnchor = self.caret
+            elif not shift:
+                self.selectionAnchor = None
+            if event.key == pygame.K_LEFT:
+                self.caret = max(0, self.caret - 1)
+            elif event.key == pygame.K_RIGHT:
+                self.caret = min(len(self.inputString), self.caret + 1)
+            elif event.key == pygame.K_HOME:
+                self.caret = 0
+            else:
+                self.caret = len(self.inputString)
+        elif event.unicode and event.unicode.isprintable():
+            self.insertText(event.unicode)
+
+        if self.selectionAnchor == self.caret:
+            self.selectionAnchor = None
+
+    def insertText(self, text: str) -> None:
+        """
+        Replace selection with text at caret, measuring only the inserted glyphs
+        """
+        self.deleteSelection()
+        text = text[:self.inputMaxLength - len(self.inputString)]
+        if not text:
             return
 
-        surfaceRect = pygame.Rect(0,0, max(self.inputBar.width, self.titleRect.width), self.inputBar.height + self.titleRect.height)
-        self.image = pygame.Surface(surfaceRect.size, pygame.SRCALPHA).convert()
-        self.image.fill(self.backgroundColor)
+        position = self.caret
+        self.inputString = self.inputString[:position] + text + self.inputString[position:]
+        self.splicePrefix(position, position, fontRegistry.measure(self.inputFontKey, text))
+        self.caret = position + len(text)
 
-        self.inputBar.center = (self.image.get_rect().centerx, self.titleRect.bottom + self.inputBar.h//2)
-        self.inputRect.center = self.inputBar.center
+    def deleteRange(self, start: int, end: int) -> None:
+        self.inputString = self.inputString[:start] + self.inputString[end:]
+        self.splicePrefix(start, end, [])
+        self.caret = start
+        self.selectionAnchor = None
 
-        if self.inputBackgroundColor:
-            pygame.draw.rect(self.image, self.inputBackgroundColor, self.inputBar, self.inputBackgroundWidth, self.inputBackgroundRounded)
+    def deleteSelection(self) -> bool:
+        """
+        Remove selected text, return true if there was a selection
+        """
+        if self.selectionAnchor is None:
+            return False
+        self.deleteRange(*self.getSelection())
+        return True
+
+    @staticmethod
+    def emptyPrefix():
+        return numpy.zeros(1, dtype=numpy.int64) if numpy is not None else [0]
+
+    def splicePrefix(self, start: int, end: int, widths: list[int]) -> None:
+        """
+        Replace advances of characters start to end with widths in the prefix sums. Sums after the edit only
+        shift by the change in width, which numpy does in one pass, so an edit anywhere costs about the same
+        """
+        prefix = self.glyphPrefix
+        base = prefix[start]
+        shift = sum(widths) - (prefix[end] - base)
+        if numpy is not None:
+            inserted = base + numpy.cumsum(widths, dtype=numpy.int64)
+            self.glyphPrefix = numpy.concatenate((prefix[:start + 1], inserted, prefix[end + 1:] + shift))
+        else:
+            self.glyphPrefix = prefix[:start + 1] + list(itertools.accumulate(widths, initial=base))[1:] + [total + shift for total in prefix[end + 1:]]
 
-        self.image.blits([(self.title, self.titleRect), (self.inputText, self.inputRect)])
+    def scrollToCaret(self) -> None:
+        """
+        Scroll horizontally just enough to keep the caret inside the text area
+        """
+        textWidth = self.glyphPrefix[-1]
+        if textWidth <= self.textArea.width:
+            self.scrollX = 0
+            return
+        caretX = self.glyphPrefix[self.caret]
+        if caretX < self.scrollX:
+            self.scrollX = caretX
+        elif caretX > self.scrollX + self.textArea.width - 1:
+            self.scrollX = caretX - self.textArea.width + 1
+        self.scrollX = max(0, min(self.scrollX, textWidth - self.textArea.width + 1))
+
+    def textOriginX(self) -> int:
+        """
+        Return image x coordinate of the first character (centered while text fits, scrolled otherwise)
+        """
+        textWidth = self.glyphPrefix[-1]
+        if textWidth <= self.textArea.width:
+            return self.textArea.centerx - textWidth//2
+        return self.textArea.left - self.scrollX
+
+    def caretFromPos(self, mousePos: Coordinate) -> int:
+        """
+        Return character index closest to mouse position
+        """
+        localX = mousePos[0] - self.rect.left - self.textOriginX()
+        index = bisect_left(self.glyphPrefix, localX)
+        if index >= len(self.glyphPrefix):
+            return len(self.inputString)
+        if index > 0 and localX - self.glyphPrefix[index - 1] < self.glyphPrefix[index] - localX:
+            index -= 1
+        return index
+
+    def renderInput(self) -> None:
+        """
+        Redraw input bar in place with only the visible span of text
+        """
+        self.image.blit(self.barBackground, self.inputBar)
+
+        if self.inputString == '':
+            self.inputText = None
+            self.inputRect = self.inputPlaceholderRect.copy()
+            self.image.blit(self.inputPlaceholder, self.inputPlaceholderRect)
+            originX = self.textArea.centerx
+        else:
+            originX = self.textOriginX()
+            start = max(0, bisect_right(self.glyphPrefix, self.scrollX) - 1)
+            end = min(len(self.inputString), bisect_left(self.glyphPrefix, self.scrollX + self.textArea.width) + 1)
+
+            self.image.set_clip(self.textArea)
+            if self.selectionAnchor is not None:
+                selStart, selEnd = self.getSelection()
+                selectionRect = pygame.Rect(originX + self.glyphPrefix[selStart], 0, self.glyphPrefix[selEnd] - self.glyphPrefix[selStart], self.inputFont.get_height())
+                selectionRect.centery = self.inputBar.centery
+                self.image.fill(Color.mapColor(self.selectionColor, self.image), selectionRect)
+
+            # the visible span changes with every keystroke, keep these one-off renders out of the shared text cache
+            self.inputText = renderUncached(self.inputFontKey, self.inputString[start:end], self.inputTextColor)
+            self.inputRect = self.inputText.get_rect(left = originX + self.glyphPrefix[start], centery = self.inputBar.centery)
+            self.image.blit(self.inputText, self.inputRect)
+            self.image.set_clip(None)
+
+        if self.clicked:
+            caretX = min(max(originX + self.glyphPrefix[self.caret], self.textArea.left), self.textArea.right - 1)
+            caretHeight = self.inputFont.get_height()
+            pygame.draw.line(self.image, Color.mapColor(self.inputTextColor, self.image), (caretX, self.inputBar.centery - caretHeight//2), (caretX, self.inputBar.centery + caretHeight//2))
 
         if self.drawBorders: self.drawOutlines(self.image)
 
-        self.rect = self.image.get_rect(center = self.dest)
-    
-    def checkSelect(self) -> bool:
+        self.dirty = True
+
+    def checkSelect(self, mousePos: Coordinate = None) -> bool:
         """
         Return true if mouse position is in input field 
         """
         tempInputBar = self.inputBar.copy()
         tempInputBar.center = (self.rect.centerx, self.rect.centery + self.inputMargin[1] + self.inputBar.height/2)
-        return tempInputBar.collidepoint(pygame.mouse.get_pos())
+        return tempInputBar.collidepoint(getMousePos(mousePos))
 
     def drawOutlines(self, surface: pygame.Surface) -> None:
         """
@@ -212,16 +1154,38 @@ class InputField(pygame.sprite.Sprite):
         """
         return self.inputString
 
+    def setInput(self, text: str) -> None:
+        """
+        Replace string in input field and move caret to the end
+        """
+        self.inputString = ''
+        self.glyphPrefix = self.emptyPrefix()
+        self.caret = 0
+        self.selectionAnchor = None
+        self.insertText(text)
+        self.scrollToCaret()
+        self.renderInput()
+
+    def getSelection(self) -> tuple[int, int]:
+        """
+        Return (start, end) character indexes of selected text
+        """
+        if self.selectionAnchor is None:
+            return (self.caret, self.caret)
+        return (min(self.caret, self.selectionAnchor), max(self.caret, self.selectionAnchor))
+
 
 # ALMOST DONE
 # COULD FIGURE OUT DECIMAL STEP
 # NEED TO FIGURE OUT HOVER LOCATION (ABOVE OR BELOW)
 # NEED TO FIGURE OUT LABEL LOCATION (SIDES OR BELOW)
-class Slider(pygame.sprite.Sprite):
+class Slider(Styled, pygame.sprite.Sprite):
     """ Create slider centered at dest with range"""
+    eventRouting = True
+    capturesPointer = True
+
     def __init__(self, dest: Coordinate, sliderSize: size, circleRadius: float, bounds: span = ['',''], **kwargs) -> None:
         super().__init__()
-        self.__dict__.update(locals())
         defaults = {
             'sliderColor' : Color.DARKGRAY,
             'circleColor' : Color.BLUE,
@@ -232,7 +1196,6 @@ class Slider(pygame.sprite.Sprite):
             'sliderLabelGap' : 2,
             'bold' : False,
             'italic' : False,
-            'scale' : bounds,
             'step' : 1,
             'backgroundColor' : screenColor,
             'transparent' : True,
@@ -242,9 +1205,10 @@ class Slider(pygame.sprite.Sprite):
             'hoverBackground' : screenColor,
         }
 
-        for attr, default in defaults.items():
-            setattr(self, attr, kwargs.get(attr, default))
-
+        self.style = Style.resolve(defaults, kwargs, sliderSize=sliderSize, circleRadius=circleRadius)
+        self.dest = dest
+        # scale is converted to floats below, so each slider keeps its own copy
+        self.scale = list(kwargs.get('scale', bounds))
         self.clicked = False
         self.sliderWidth, self.sliderHeight = self.sliderSize
 
@@ -254,23 +1218,32 @@ class Slider(pygame.sprite.Sprite):
         maxVal = Label([0, 0], bounds[1], Color.WHITE, self.labelSize)
 
         surfaceRect = pygame.Rect(0,0,sliderArea.w + minVal.rect.w/2 + maxVal.rect.w/2, sliderArea.h + minVal.rect.h + self.sliderLabelGap)
-        self.original_image = pygame.Surface(surfaceRect.size, pygame.SRCALPHA).convert_alpha()
+        self.original_image = convertSurface(newSurface(surfaceRect.size, pygame.SRCALPHA), True)
         if not self.transparent: self.original_image.fill(self.backgroundColor)
 
         sliderBarRect.center = [self.original_image.get_rect().centerx, sliderArea.centery]
         minVal.rect.midtop = [sliderBarRect.left, sliderArea.h + self.sliderLabelGap]
         maxVal.rect.midtop = [sliderBarRect.right, sliderArea.h + self.sliderLabelGap] 
 
-        self.sliderBar = pygame.draw.rect(self.original_image, self.sliderColor, sliderBarRect, 0, 30)
+        self.sliderBar = drawRoundedRect(self.original_image, self.sliderColor, sliderBarRect, 0, 30)
         self.original_image.blits([(minVal.image, minVal.rect), (maxVal.image, maxVal.rect)])
 
-        self.image = self.original_image.copy()
-        
-        self.sliderCircle = pygame.draw.circle(self.image, self.circleColor, self.sliderBar.midleft, self.circleRadius)
+        # knob layer is rendered once and composited over the static track layer
+        knobSize = int(self.circleRadius*2) + 2
+        self.knobImage = convertSurface(newSurface((knobSize, knobSize), pygame.SRCALPHA), True)
+        knobCenter = self.knobImage.get_rect().center
+        self.knobBounds = pygame.draw.circle(self.knobImage, self.circleColor, knobCenter, self.circleRadius)
         if self.circleOutlineColor:
-            self.sliderCircleOutline = pygame.draw.circle(self.image, self.circleOutlineColor, self.sliderBar.midleft, self.circleRadius, self.circleOutlineWidth)
+            pygame.draw.circle(self.knobImage, self.circleOutlineColor, knobCenter, self.circleRadius, self.circleOutlineWidth)
+        self.knobImage = optimizeImage(self.knobImage)
+
+        self.showHover = False
+        self.layerRect = None
 
-        self.non_hover_image = self.image.copy()
+        self.original_image = optimizeImage(self.original_image, static=False)
+        self.image = surfacePool.copy(self.original_image)
+        self.placeKnob(self.sliderBar.midleft)
+        self.composite()
         self.rect = self.image.get_rect(center=dest)
 
         if (isinstance(self.scale[0], (int, float)) or self.scale[0].isdigit()) and (isinstance(self.scale[1], (int, float)) or self.scale[1].isdigit()):
@@ -282,45 +1255,78 @@ class Slider(pygame.sprite.Sprite):
         else:
             self.hover = False
 
-    def update(self, event_list: list[pygame.event.Event]) -> None:
+    def update(self, event_list: list[pygame.event.Event], **kwargs) -> None:
+        # motion events are coalesced, only the last pointer position before a release is applied
+        lastMotion = None
+        changed = False
         for event in event_list:
-            if event.type == pygame.MOUSEBUTTONDOWN and self.checkSelect():
+            if event.type == pygame.MOUSEBUTTONDOWN and self.checkSelect(event.pos):
                 self.clicked = True
             if self.clicked and event.type == pygame.MOUSEBUTTONUP:
+                if lastMotion:
+                    self.moveKnob(lastMotion.pos)
+                    lastMotion = None
                 self.clicked = False
-                if self.hover:
-                    self.image = self.non_hover_image
+                changed = changed or self.showHover
+                self.showHover = False
             if self.clicked and event.type == pygame.MOUSEMOTION:
-                self.image = self.original_image.copy()
+                lastMotion = event
+
+        if lastMotion:
+            self.moveKnob(lastMotion.pos)
+            self.showHover = self.hover
+            changed = True
+
+        if changed:
+            self.composite()
+
+    def moveKnob(self, pos: Coordinate) -> None:
+        """ Move knob to pointer position snapped to span and step """
+        mousePos = self.getRelativeMousePos(pos)
+        self.currentValue = self.getCurrentValue(mousePos[0])
+        self.placeKnob(self.calcCircleCenter(mousePos))
+
+    def placeKnob(self, center: Coordinate) -> None:
+        self.knobRect = self.knobImage.get_rect(center = center)
+        self.sliderCircle = self.knobBounds.move(self.knobRect.topleft)
+
+    def composite(self) -> None:
+        """
+        Restore area under previous knob and hover tag from the track layer, then blit knob and tag
+        """
+        if self.layerRect:
+            self.image.fill((0,0,0,0), self.layerRect)
+            self.image.blit(self.original_image, self.layerRect, self.layerRect)
 
-                mousePos = self.getRelativeMousePos()
-                self.currentValue = self.getCurrentValue(mousePos[0])
+        self.image.blit(self.knobImage, self.knobRect)
+        layerRect = self.knobRect.copy()
 
-                # snap to step 
-                self.sliderCircle = pygame.draw.circle(self.image, self.circleColor, self.calcCircleCenter(mousePos), self.circleRadius)
+        if self.showHover:
+            hoverTag = self.getHoverTag(int(self.currentValue))
+            hoverRect = hoverTag.get_rect(midtop = [self.sliderCircle.centerx, self.sliderCircle.bottom + self.sliderLabelGap])
+            self.image.blit(hoverTag, hoverRect)
+            layerRect.union_ip(hoverRect)
 
-                if self.circleOutlineColor:
-                    self.sliderCircleOutline = pygame.draw.circle(self.image, self.circleOutlineColor, mousePos, self.circleRadius, self.circleOutlineWidth)
+        self.layerRect = layerRect.clip(self.image.get_rect())
+        self.dirty = True
 
-                if self.hover:
-                    self.non_hover_image = self.image.copy()
-                    hoverMidTop = [self.sliderCircle.centerx, self.sliderCircle.bottom + self.sliderLabelGap]
-                    hoverTag = Label(hoverMidTop, int(self.currentValue), self.hoverColor, 10, destOrientation='midtop', 
-                                     textBackgroundColor=Color.RED, textBackgroundRounded=2, margin=[10,0])
-                    self.image.blit(hoverTag.image, hoverTag.rect)
+    def getHoverTag(self, value: int) -> pygame.Surface:
+        """ Return hover tag for value from the shared text cache, so sliders showing the same value share it """
+        return textCache.composite(('hoverTag', str(value), colorKey(self.hoverColor)), lambda: Label([0, 0], value, self.hoverColor, 10,
+                                   textBackgroundColor=Color.RED, textBackgroundRounded=2, margin=[10,0]).image)
 
-    def checkSelect(self) -> bool:
+    def checkSelect(self, mousePos: Coordinate = None) -> bool:
         """
         Return true if mouse position is on slider circle
         """
         tempCircle = self.sliderCircle.copy()
         centerDif = [self.image.get_rect().centerx - tempCircle.centerx, self.image.get_rect().centery - tempCircle.centery]
         tempCircle.center = [self.rect.centerx - centerDif[0], self.rect.centery - centerDif[1]]
-        return tempCircle.collidepoint(pygame.mouse.get_pos())
+        return tempCircle.collidepoint(getMousePos(mousePos))
     
-    def getRelativeMousePos(self) -> Coordinate:
+    def getRelativeMousePos(self, mousePos: Coordinate = None) -> Coordinate:
         """ Return coordinate translation of mouse to slider circle """
-        mousePos = pygame.mouse.get_pos()
+        mousePos = getMousePos(mousePos)
         mouseX = min(max(self.sliderBar.left, self.sliderBar.centerx + (mousePos[0] - self.dest[0])), self.sliderBar.right)
         mouseY = self.sliderBar.centery
         return [mouseX, mouseY] 
@@ -351,136 +1357,593 @@ class Slider(pygame.sprite.Sprite):
         return(newCircleCenterX, mousePos[1])
 
 
-class Table(pygame.sprite.Sprite):
+class Table(Styled, pygame.sprite.Sprite):
+    """
+    Create column of text rows with first row centered at dest.
+    Passing viewportHeight makes the table virtualized and scrollable: textList may then be
+    a sequence or a callable returning the row at an index (with rowCount given), and only
+    visible rows plus overscan are rasterized. Without viewportWidth the viewport starts as wide
+    as the first screenful and widens when a wider row scrolls in.
+    """
+    eventRouting = True
+
+    ready = None
+
     def __init__(self, dest: Coordinate, textList: list, textColor: ColorValue, textSize: int, fontName: str, **kwargs) -> None:
         super().__init__()
-        self.__dict__.update(locals())
         defaults = {
             'bold' : False,
             'italic' : False,
             'backgroundColor' : [0,0,0],
+            'overscan' : 2,
+            'scrollSpeed' : 3,
         }
 
-        for attr, default in defaults.items():
-            setattr(self, attr, kwargs.get(attr, default))
+        self.style = Style.resolve(defaults, kwargs, textColor=textColor, textSize=textSize, fontName=fontName)
+        self.dest = dest
+        self.textList = textList
+        # viewport settings are per table, without viewportWidth the viewport widens to the widest row rasterized
+        self.viewportHeight = kwargs.get('viewportHeight')
+        self.viewportWidth = kwargs.get('viewportWidth')
+        self.rowCount = kwargs.get('rowCount')
+        deferred = kwargs.get('deferred', False)
+
+        self.fontKey = FontRegistry.makeKey(fontName, textSize, self.bold, self.italic)
+        if self.viewportHeight:
+            self.initViewport()
+            return
+
+        if deferred:
+            font = getFont(*self.fontKey)
+            maxWidth = max([font.size(str(item))[0] for item in textList], default=0)
+            self.original_image = convertSurface(newSurface((maxWidth, len(textList) * textSize)))
+            self.original_image.fill(self.backgroundColor)
+            rowHeight = font.size(str(textList[0]))[1]
+        else:
+            self.original_image = optimizeImage(self.renderList(), static=False)
+            rowHeight = self.listElements[0][1].height
 
-        font = pygame.font.SysFont(fontName, textSize, self.bold)
-        self.listElements = []
+        self.image = self.original_image
+        self.rect = self.image.get_rect(centerx = dest[0], top = dest[1] - rowHeight/2)
+        if deferred:
+            priority = kwargs.get('priority')
+            priority = priority if priority is not None else visibilityPriority(self.rect)
+            self.ready = renderpool.pool.submit(lambda: self.renderList(workerRender), self.swapImage, priority)
+        self.dirty = True
+
+    def renderList(self, render = renderText) -> pygame.Surface:
+        """ Rasterize rows centered in a column, render may be workerRender off the main thread """
+        listElements = []
         maxWidth = 0
-        for order, item in enumerate(textList):
-            text = font.render(item, True, textColor)
-            textRect = text.get_rect().move(0, order*textSize)
-            self.listElements.append([text, textRect])
+        for order, item in enumerate(self.textList):
+            text = render(self.fontKey, item, self.textColor)
+            textRect = text.get_rect().move(0, order*self.textSize)
+            listElements.append([text, textRect])
             maxWidth = max(maxWidth, textRect.width)
 
-        surfaceRect = pygame.Rect(0,0, maxWidth, len(textList) * textSize)
-        self.original_image = pygame.Surface(surfaceRect.size, pygame.SRCALPHA).convert()
-        self.original_image.fill(self.backgroundColor)
+        image = newSurface((maxWidth, len(self.textList) * self.textSize), pygame.SRCALPHA)
+        image.fill(self.backgroundColor)
 
-        for text, textRect in self.listElements:
-            textRect.centerx = self.original_image.get_rect().centerx
-        
-        self.original_image.blits(self.listElements)
+        for text, textRect in listElements:
+            textRect.centerx = image.get_rect().centerx
 
-        self.image = self.original_image
-        self.rect = self.image.get_rect(centerx = dest[0], top = dest[1] - self.listElements[0][1].height/2)
+        image.blits(listElements)
+        self.listElements = listElements
+        return image
 
+    def swapImage(self, image: pygame.Surface) -> 'Table':
+        """ Replace placeholder with rows rendered by a worker, on the main thread """
+        self.original_image = self.image = optimizeImage(image, static=False)
+        self.dirty = True
+        return self
 
-class Switch(pygame.sprite.Sprite):
-    def __init__(self, dest: Coordinate, width: int, height: int, **kwargs) -> None:
+    def initViewport(self) -> None:
+        """
+        Set up virtualized mode with a fixed size viewport and pooled row surfaces
+        """
+        self.rowSource = self.textList
+        self.rowHeight = self.textSize
+        self.font = getFont(*self.fontKey)
+        self.scrollY = 0
+        self.rowSlots = {}
+
+        self.measuredWidth = self.viewportWidth is None
+        if self.measuredWidth:
+            visibleRows = min(self.getRowCount(), self.viewportHeight // self.rowHeight + 1)
+            self.viewportWidth = max([self.font.size(self.getRow(index))[0] for index in range(visibleRows)], default=1)
+
+        self.image = surfacePool.acquire((self.viewportWidth, self.viewportHeight), alpha = False)
+        self.rect = self.image.get_rect(centerx = self.dest[0], top = self.dest[1] - self.font.get_height()/2)
+        self.renderViewport()
+
+    def getRow(self, index: int) -> str:
+        """ Return text of row at index from the row source """
+        if callable(self.rowSource):
+            return str(self.rowSource(index))
+        return str(self.rowSource[index])
+
+    def getRowCount(self) -> int:
+        if self.rowCount is not None:
+            return self.rowCount
+        return len(self.rowSource)
+
+    def renderViewport(self) -> None:
+        """
+        Redraw visible rows, rasterizing only rows that scrolled into the overscan range
+        """
+        rowCount = self.getRowCount()
+        first = self.scrollY // self.rowHeight
+        last = min(rowCount, (self.scrollY + self.viewportHeight - 1) // self.rowHeight + 1)
+        keepFirst, keepLast = max(0, first - self.overscan), min(rowCount, last + self.overscan)
+
+        for index in [index for index in self.rowSlots if not keepFirst <= index < keepLast]:
+            surfacePool.release(self.rowSlots.pop(index))
+
+        self.image.fill(Color.mapColor(self.backgroundColor, self.image))
+        viewportWidth = self.viewportWidth
+        for index in range(keepFirst, keepLast):
+            slot = self.rowSlots.get(index)
+            if slot is None:
+                slot = self.fillSlot(index)
+                if self.viewportWidth != viewportWidth:
+                    # a wider row resized the viewport and dropped every slot, draw again at the new width
+                    surfacePool.release(slot)
+                    return self.renderViewport()
+                self.rowSlots[index] = slot
+            if first <= index < last:
+                self.image.blit(slot, (0, index*self.rowHeight - self.scrollY))
+        self.dirty = True
+
+    def fillSlot(self, index: int) -> pygame.Surface:
+        """
+        Rasterize row into a slot surface borrowed from the surface pool,
+        widening a measured viewport to fit the row
+        """
+        text = rasterize(self.font, self.getRow(index), self.textColor)
+        if self.measuredWidth and text.get_width() > self.viewportWidth:
+            self.resizeViewport(text.get_width())
+        slot = surfacePool.acquire((self.viewportWidth, self.font.get_height()))
+        slot.blit(text, text.get_rect(centerx = self.viewportWidth//2))
+        return slot
+
+    def resizeViewport(self, viewportWidth: int) -> None:
+        """
+        Change viewport width, dropping row slots rasterized at the old width
+        """
+        for slot in self.rowSlots.values():
+            surfacePool.release(slot)
+        self.rowSlots.clear()
+        surfacePool.release(self.image)
+        self.viewportWidth = viewportWidth
+        self.image = surfacePool.acquire((self.viewportWidth, self.viewportHeight), alpha = False)
+        self.rect = self.image.get_rect(centerx = self.dest[0], top = self.rect.top)
+
+    def scrollTo(self, scrollY: int, force: bool = False) -> None:
+        """
+        Scroll so that pixel offset scrollY is at the top of the viewport
+        """
+        maxScroll = max(0, self.getRowCount()*self.rowHeight - self.viewportHeight)
+        scrollY = int(max(0, min(scrollY, maxScroll)))
+        if scrollY != self.scrollY or force:
+            self.scrollY = scrollY
+            self.renderViewport()
+
+    def scrollBy(self, dy: int) -> None:
+        self.scrollTo(self.scrollY + dy)
+
+    def refresh(self) -> None:
+        """
+        Re-rasterize visible rows after the row source changed
+        """
+        for slot in self.rowSlots.values():
+            surfacePool.release(slot)
+        self.rowSlots.clear()
+        self.scrollTo(self.scrollY, force = True)
+
+    def update(self, event_list: list[pygame.event.Event], **kwargs) -> None:
+        if not self.viewportHeight:
+            return
+        for event in event_list:
+            if event.type == pygame.MOUSEWHEEL and self.checkSelect(kwargs.get('mousePos')):
+                self.scrollBy(-event.y * self.scrollSpeed * self.rowHeight)
+
+    def checkSelect(self, mousePos: Coordinate = None) -> bool:
+        """
+        Return true if mouse position is on table
+        """
+        return self.rect.collidepoint(getMousePos(mousePos))
+
+
+class ColumnData:
+    """
+    Columnar data model with one NumPy array per column.
+    Sort permutations are cached per (column, descending) and filters are boolean masks,
+    so changing the view only reorders row handles (indexes into the columns).
+    """
+    def __init__(self, columns: dict[str, list]) -> None:
+        if numpy is None:
+            raise ImportError('ColumnData requires numpy')
+        self.columns = {name: numpy.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('all columns must have the same length')
+        self.rowCount = lengths.pop() if lengths else 0
+
+        self.sortCache = {}
+        self.filters = {}
+        self.sortColumn = None
+        self.descending = False
+        self.view = numpy.arange(self.rowCount)
+
+    def sortIndex(self, column: str, descending: bool = False) -> numpy.ndarray:
+        """ Return cached permutation that sorts rows by column """
+        key = (column, descending)
+        index = self.sortCache.get(key)
+        if index is None:
+            index = numpy.argsort(self.columns[column], kind='stable')
+            if descending: index = index[::-1].copy()
+            self.sortCache[key] = index
+        return index
+
+    def setSort(self, column: str = None, descending: bool = False) -> None:
+        """ Sort view by column, or restore source order with None """
+        self.sortColumn = column
+        self.descending = descending
+        self.rebuildView()
+
+    def setFilter(self, name: str, mask) -> None:
+        """
+        Add or replace named filter, mask is a boolean array or a callable taking the columns dict and returning one
+        """
+        if callable(mask):
+            mask = mask(self.columns)
+        mask = numpy.asarray(mask, dtype=bool)
+        if mask.shape != (self.rowCount,):
+            raise ValueError('filter mask must have one entry per row')
+        self.filters[name] = mask
+        self.rebuildView()
+
+    def clearFilter(self, name: str = None) -> None:
+        """ Remove named filter, or every filter with None """
+        if name is None:
+            self.filters.clear()
+        else:
+            self.filters.pop(name, None)
+        self.rebuildView()
+
+    def rebuildView(self) -> None:
+        order = self.sortIndex(self.sortColumn, self.descending) if self.sortColumn else numpy.arange(self.rowCount)
+        if self.filters:
+            mask = numpy.logical_and.reduce(list(self.filters.values()))
+            order = order[mask[order]]
+        self.view = order
+
+    def invalidate(self) -> None:
+        """ Drop cached sort indexes after column arrays were modified in place """
+        self.sortCache.clear()
+        self.rebuildView()
+
+    def getValue(self, column: str, row: int):
+        return self.columns[column][row]
+
+
+class ColumnTable(pygame.sprite.Sprite):
+    """
+    Create scrollable multi-column table with header row, top centered at dest.
+    Clicking a header sorts by that column (again to reverse). Rendered rows are cached
+    by row handle, so switching sort or filter only rasterizes rows not seen before.
+    """
+    eventRouting = True
+
+    def __init__(self, dest: Coordinate, data: ColumnData | dict, textColor: ColorValue, textSize: int, fontName: str,
+                 viewportHeight: int, **kwargs) -> None:
         super().__init__()
-        self.__dict__.update(locals())
+        self.data = data
+        self.textColor = textColor
+        self.viewportHeight = viewportHeight
         defaults = {
-
-        }        
+            'bold' : False,
+            'italic' : False,
+            'backgroundColor' : [0,0,0],
+            'headerColor' : Color.WHITE,
+            'headerBackgroundColor' : Color.DIMGRAY,
+            'columnWidths' : None,
+            'formats' : {},
+            'cellPadding' : 8,
+            'overscan' : 2,
+            'scrollSpeed' : 3,
+            'maxCachedRows' : 2048,
+        }
 
         for attr, default in defaults.items():
             setattr(self, attr, kwargs.get(attr, default))
 
+        if not isinstance(self.data, ColumnData):
+            self.data = ColumnData(self.data)
+        self.columnNames = list(self.data.columns)
+
+        self.fontKey = FontRegistry.makeKey(fontName, textSize, self.bold, self.italic)
+        self.headerFontKey = FontRegistry.makeKey(fontName, textSize, True, self.italic)
+        self.font = getFont(*self.fontKey)
+        self.rowHeight = self.font.get_height()
+        self.scrollY = 0
+        self.rowCache = OrderedDict()
+
+        if self.columnWidths is None:
+            self.columnWidths = self.measureColumns()
+        self.columnLefts = [sum(self.columnWidths[:index]) for index in range(len(self.columnWidths))]
+        self.width = sum(self.columnWidths)
+
+        self.image = surfacePool.acquire((self.width, self.rowHeight + viewportHeight), alpha = False)
+        self.rect = self.image.get_rect(midtop = dest)
+        self.renderHeader()
+        self.renderRows()
+
+    def measureColumns(self) -> list[int]:
+        """ Return column widths fitting header, the first screenful and the extreme values of each column """
+        headerFont = getFont(*self.headerFontKey)
+        sample = list(self.data.view[:self.viewportHeight // self.rowHeight + 1])
+        widths = []
+        for name in self.columnNames:
+            values = self.data.columns[name]
+            extremes = []
+            if len(values) and values.dtype.kind in 'iuf':
+                extremes = [values.argmin(), values.argmax()]
+            elif len(values) and values.dtype.kind in 'US':
+                extremes = [numpy.char.str_len(values).argmax()]
+            cellWidths = [self.font.size(self.formatCell(name, row))[0] for row in sample + extremes]
+            widths.append(max([headerFont.size(name + ' ^')[0]] + cellWidths) + self.cellPadding*2)
+        return widths
+
+    def formatCell(self, column: str, row: int) -> str:
+        return format(self.data.getValue(column, row), self.formats.get(column, ''))
+
+    def renderHeader(self) -> None:
+        headerRect = pygame.Rect(0, 0, self.width, self.rowHeight)
+        self.image.fill(self.headerBackgroundColor, headerRect)
+        for name, left, width in zip(self.columnNames, self.columnLefts, self.columnWidths):
+            title = name
+            if name == self.data.sortColumn:
+                title += ' v' if self.data.descending else ' ^'
+            text = renderText(self.headerFontKey, title, self.headerColor)
+            self.image.blit(text, text.get_rect(center = (left + width//2, headerRect.centery)))
+        self.dirty = True
+
+    def getRowSurface(self, row: int) -> pygame.Surface:
+        """
+        Return rendered row for row handle, rasterizing its cells only on a cache miss
+        """
+        surface = self.rowCache.get(row)
+        if surface is not None:
+            self.rowCache.move_to_end(row)
+            return surface
+
+        if len(self.rowCache) >= self.maxCachedRows:
+            _, surface = self.rowCache.popitem(last=False)
+            surface.fill((0,0,0,0))
+        else:
+            surface = surfacePool.acquire((self.width, self.rowHeight))
+
+        for name, left, width in zip(self.columnNames, self.columnLefts, self.columnWidths):
+            text = rasterize(self.font, self.formatCell(name, row), self.textColor)
+            surface.set_clip((left, 0, width, self.rowHeight))
+            surface.blit(text, text.get_rect(centerx = left + width//2))
+        surface.set_clip(None)
+        self.rowCache[row] = surface
+        return surface
+
+    def renderRows(self) -> None:
+        """
+        Redraw visible rows of the current view below the header
+        """
+        view = self.data.view
+        first = self.scrollY // self.rowHeight
+        last = min(len(view), (self.scrollY + self.viewportHeight - 1) // self.rowHeight + 1)
+
+        bodyRect = pygame.Rect(0, self.rowHeight, self.width, self.viewportHeight)
+        self.image.fill(Color.mapColor(self.backgroundColor, self.image), bodyRect)
+        self.image.set_clip(bodyRect)
+        for position in range(max(0, first - self.overscan), min(len(view), last + self.overscan)):
+            surface = self.getRowSurface(int(view[position]))
+            if first <= position < last:
+                self.image.blit(surface, (0, self.rowHeight + position*self.rowHeight - self.scrollY))
+        self.image.set_clip(None)
+        self.dirty = True
+
+    def sortBy(self, column: str = None, descending: bool = False) -> None:
+        self.data.setSort(column, descending)
+        self.renderHeader()
+        self.scrollY = 0
+        self.renderRows()
+
+    def setFilter(self, name: str, mask) -> None:
+        self.data.setFilter(name, mask)
+        self.scrollTo(self.scrollY, force = True)
+
+    def clearFilter(self, name: str = None) -> None:
+        self.data.clearFilter(name)
+        self.scrollTo(self.scrollY, force = True)
+
+    def scrollTo(self, scrollY: int, force: bool = False) -> None:
+        maxScroll = max(0, len(self.data.view)*self.rowHeight - self.viewportHeight)
+        scrollY = int(max(0, min(scrollY, maxScroll)))
+        if scrollY != self.scrollY or force:
+            self.scrollY = scrollY
+            self.renderRows()
+
+    def scrollBy(self, dy: int) -> None:
+        self.scrollTo(self.scrollY + dy)
+
+    def refresh(self) -> None:
+        """
+        Drop cached rows and sort indexes after the underlying columns changed
+        """
+        for surface in self.rowCache.values():
+            surfacePool.release(surface)
+        self.rowCache.clear()
+        self.data.invalidate()
+        self.scrollTo(self.scrollY, force = True)
+
+    def update(self, event_list: list[pygame.event.Event], **kwargs) -> None:
+        for event in event_list:
+            if event.type == pygame.MOUSEWHEEL and self.checkSelect(kwargs.get('mousePos')):
+                self.scrollBy(-event.y * self.scrollSpeed * self.rowHeight)
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.checkSelect(event.pos):
+                column = self.columnAt(event.pos)
+                if column is not None:
+                    descending = column == self.data.sortColumn and not self.data.descending
+                    self.sortBy(column, descending)
+
+    def columnAt(self, mousePos: Coordinate) -> str:
+        """ Return name of header column under mouse position, None if not on the header """
+        localX, localY = mousePos[0] - self.rect.left, mousePos[1] - self.rect.top
+        if not 0 <= localY < self.rowHeight:
+            return None
+        for name, left, width in zip(self.columnNames, self.columnLefts, self.columnWidths):
+            if left <= localX < left + width:
+                return name
+        return None
+
+    def checkSelect(self, mousePos: Coordinate = None) -> bool:
+        """
+        Return true if mouse position is on table
+        """
+        return self.rect.collidepoint(getMousePos(mousePos))
+
+
+class Switch(Styled, pygame.sprite.Sprite):
+    """
+    Toggle whose knob is tweened on the shared animation scheduler. Its update steps the scheduler so it
+    animates in plain sprite groups too, the scheduler ignores these steps when UIManager drives it
+    """
+    eventRouting = True
+
+    def __init__(self, dest: Coordinate, width: int, height: int, **kwargs) -> None:
+        super().__init__()
+        defaults = {
+            'knobSpeed' : 600,
+            'easing' : 'linear',
+        }
+
+        self.style = Style.resolve(defaults, kwargs)
+
         surfaceRect = pygame.Rect(0, 0, width+10, height+10)
-        self.original_image = pygame.Surface(surfaceRect.size, pygame.SRCALPHA).convert()
+        self.original_image = convertSurface(newSurface(surfaceRect.size))
         self.original_image.fill(Color.DIMGRAY)
 
         switchBarRect = pygame.Rect(0, 0, width, height)
         switchBarRect.center = self.original_image.get_rect().center
-        switchBar = pygame.draw.rect(self.original_image, Color.DARKGRAY, switchBarRect, 0, 25)
-
-        self.image = self.original_image.copy()
+        switchBar = drawRoundedRect(self.original_image, Color.DARKGRAY, switchBarRect, 0, 25)
 
-        switchCircle = pygame.draw.circle(self.image, (0,0,255), [switchBarRect.left + switchBar.height/2, switchBarRect.centery], switchBar.height/2)
+        # knob is rendered once and blitted wherever the tween puts it
+        radius = switchBar.height/2
+        knobSize = int(radius*2) + 2
+        self.knobImage = convertSurface(newSurface((knobSize, knobSize), pygame.SRCALPHA), True)
+        self.knobCenter = self.knobImage.get_rect().center
+        self.knobBounds = pygame.draw.circle(self.knobImage, Color.BLUE, self.knobCenter, radius)
+        self.knobImage = optimizeImage(self.knobImage)
 
+        self.image = surfacePool.copy(self.original_image)
         self.rect = self.image.get_rect(center = dest)
 
         self.clicked = False
         self.switchBar = switchBar
-        self.switchCircle = switchCircle
+        self.switchCircle = self.placeKnob((int(switchBarRect.left + radius), switchBarRect.centery))
+        self.knobX = self.switchCircle.centerx
+        self.dirty = True
 
-    def update(self, event_list: list[pygame.event.Event]) -> None:
+    def update(self, event_list: list[pygame.event.Event], **kwargs) -> None:
         for event in event_list:
-            if event.type == pygame.MOUSEBUTTONDOWN and self.checkSelect():
+            if event.type == pygame.MOUSEBUTTONDOWN and self.checkSelect(event.pos):
                 self.clicked = not self.clicked
+                self.startKnobTween()
 
-        self.image = self.original_image.copy()
-
-        if self.clicked and self.switchCircle.right < self.switchBar.right:
-            self.switchCircle.move_ip(10, 0)
-        elif not self.clicked and self.switchCircle.left > self.switchBar.left:
-            self.switchCircle.move_ip(-10, 0)
-
-        pygame.draw.circle(self.image, (0,0,255), self.switchCircle.center, self.switchBar.height/2)
-
-        self.rect = self.image.get_rect(center = self.dest)
+        if animation.scheduler.is_active(self):
+            animation.scheduler.step()
 
-    def checkSelect(self) -> bool:
+    def startKnobTween(self) -> None:
+        """
+        Tween knob toward the side matching clicked at knobSpeed pixels per second
+        """
+        radius = self.switchBar.height/2
+        target = self.switchBar.right - radius if self.clicked else self.switchBar.left + radius
+        animation.scheduler.cancel_owner(self)
+        animation.scheduler.add(self, 'moveKnob', self.knobX, target, abs(target - self.knobX) / self.knobSpeed, self.easing)
+
+    def moveKnob(self, knobX: float) -> None:
+        """ Redraw knob at knobX in place """
+        self.knobX = knobX
+        self.image.blit(self.original_image, (0, 0))
+        self.switchCircle = self.placeKnob((round(knobX), self.switchCircle.centery))
+        self.dirty = True
+
+    def placeKnob(self, center: Coordinate) -> pygame.Rect:
+        """ Blit prerendered knob centered on center, return the circle bounds """
+        topleft = (center[0] - self.knobCenter[0], center[1] - self.knobCenter[1])
+        self.image.blit(self.knobImage, topleft)
+        return self.knobBounds.move(topleft)
+
+    def checkSelect(self, mousePos: Coordinate = None) -> bool:
         """
         Return true if mouse position is on switch circle
         """
         tempBar = self.switchBar.copy()
         tempBar.center = self.rect.center
 
-        return tempBar.collidepoint(pygame.mouse.get_pos())
+        return tempBar.collidepoint(getMousePos(mousePos))
+
+    def isAnimating(self) -> bool:
+        """
+        Return true while switch circle is still moving toward its resting side
+        """
+        return animation.scheduler.is_active(self)
 
 
 class Button(pygame.sprite.Sprite): 
-    def __init__(self, centerX, centerY, textString, textSize, action):
+    eventRouting = True
+    capturesPointer = True
+    tracksHover = True
+    ready = None
+
+    def __init__(self, centerX, centerY, textString, textSize, action, deferred: bool = False, priority: float = None):
         super().__init__()
 
         self.centerX = centerX
         self.centerY = centerY
 
-        font = pygame.font.SysFont('Arial', textSize, bold=True)
+        fontKey = FontRegistry.makeKey('Arial', textSize, bold=True)
 
-        text = font.render(textString, True, Color.WHITE)
         # pygame.draw.circle(text, WHITE, text.get_rect().center, 10) <-- is in front of text
-        textRect = text.get_rect()
-        self.original_image = pygame.Surface(textRect.size, pygame.SRCALPHA)
-        self.original_image.fill(Color.BLACK)
-        self.original_image.blit(text, textRect)
-
-        text = font.render(textString, True, Color.DARKGRAY)
-        textRect = text.get_rect()
-        self.hovered_image = pygame.Surface(textRect.size, pygame.SRCALPHA)
-        self.hovered_image.fill(Color.BLACK)
-        self.hovered_image.blit(text, textRect)
-
-        text = font.render(textString, True, Color.DIMGRAY)
-        textRect = text.get_rect()
-        self.clicked_image = pygame.Surface(textRect.size, pygame.SRCALPHA)
-        self.clicked_image.fill(Color.BLACK)
-        self.clicked_image.blit(text, textRect)
+        cacheKey = prerender.cache.keyFor('Button', {'textString': textString, 'textSize': textSize}, [fontKey])
+        cached = prerender.cache.load(cacheKey)
+        if cached:
+            self.original_image, self.hovered_image, self.clicked_image = [optimizeImage(variant) for variant in cached]
+        elif deferred:
+            placeholder = convertSurface(newSurface(getFont(*fontKey).size(str(textString))))
+            placeholder.fill(Color.BLACK)
+            self.original_image = self.hovered_image = self.clicked_image = placeholder
+        else:
+            variants = self.renderVariants(fontKey, textString)
+            prerender.cache.store(cacheKey, variants)
+            self.original_image, self.hovered_image, self.clicked_image = [optimizeImage(variant) for variant in variants]
 
         self.image = self.original_image
         self.rect = self.image.get_rect(center = (centerX, centerY))
+        if deferred and not cached:
+            priority = priority if priority is not None else visibilityPriority(self.rect)
+            self.ready = renderpool.pool.submit(lambda: self.renderVariants(fontKey, textString, workerRender),
+                                                lambda variants: self.swapVariants(variants, cacheKey), priority)
 
         self.clicked = False
         self.dragged = False
         self.hovered = False
+        self.dirty = True
 
         self.action = action
         self.textString = textString
     
-    def update(self, event_list):
-        self.hovered = self.rect.collidepoint(pygame.mouse.get_pos())
+    def update(self, event_list, mousePos: Coordinate = None, **kwargs):
+        self.hovered = self.checkSelect(mousePos)
 
         for event in event_list:
             if event.type == pygame.MOUSEBUTTONDOWN and self.hovered:
@@ -494,26 +1957,304 @@ class Button(pygame.sprite.Sprite):
                 self.dragged = False
 
         if self.clicked or self.dragged:
-            self.image = self.clicked_image
+            image = self.clicked_image
         elif self.hovered:
-            self.image = self.hovered_image
+            image = self.hovered_image
         else:
-            self.image = self.original_image
-        
-        self.rect = self.image.get_rect(center = (self.centerX, self.centerY))
+            image = self.original_image
+
+        if image is not self.image:
+            self.image = image
+            self.rect = self.image.get_rect(center = (self.centerX, self.centerY))
+            self.dirty = True
         
+    def checkSelect(self, mousePos: Coordinate = None) -> bool:
+        """
+        Return true if mouse position is on button
+        """
+        return self.rect.collidepoint(getMousePos(mousePos))
+
+    @staticmethod
+    def renderVariants(fontKey: FontKey, textString: str, render = renderText) -> list[pygame.Surface]:
+        """ Rasterize normal, hovered and clicked button text on the button background """
+        variants = []
+        for color in (Color.WHITE, Color.DARKGRAY, Color.DIMGRAY):
+            text = render(fontKey, textString, color)
+            image = newSurface(text.get_size(), pygame.SRCALPHA)
+            image.fill(Color.BLACK)
+            image.blit(text, (0, 0))
+            variants.append(image)
+        return variants
+
+    def swapVariants(self, variants: list[pygame.Surface], cacheKey: str = None) -> 'Button':
+        """ Replace placeholder with variants rendered by a worker, on the main thread """
+        prerender.cache.store(cacheKey, variants)
+        self.original_image, self.hovered_image, self.clicked_image = [optimizeImage(variant) for variant in variants]
+        self.image = self.clicked_image if self.clicked or self.dragged else self.hovered_image if self.hovered else self.original_image
+        self.dirty = True
+        return self
+
     def onClick(self):
         self.action()
         # print('clicked button')
 
 
+class DirtyGroup(pygame.sprite.Group):
+    """ Sprite group that only redraws dirty widgets and returns the screen areas that changed """
+    def __init__(self, *sprites, background: ColorValue | pygame.Surface = None) -> None:
+        super().__init__(*sprites)
+        self.background = background
 
+    def draw(self, surface: pygame.Surface, background: ColorValue | pygame.Surface = None) -> list[pygame.Rect]:
+        """
+        Clear and redraw areas covered by dirty widgets, return changed rects for pygame.display.update
+        Widgets without a dirty attribute are redrawn every call
+        """
+        background = self.getBackground(background)
+
+        dirtyRects = self.lostsprites
+        self.lostsprites = []
+        dirtySprites = []
+        for sprite in self.sprites():
+            if not getattr(sprite, 'dirty', True):
+                continue
+            dirtySprites.append(sprite)
+            oldRect = self.spritedict[sprite]
+            if oldRect and oldRect.colliderect(sprite.rect):
+                dirtyRects.append(oldRect.union(sprite.rect))
+                continue
+            if oldRect:
+                dirtyRects.append(oldRect)
+            dirtyRects.append(sprite.rect.copy())
+
+        if not dirtyRects:
+            return dirtyRects
+
+        # overlapping areas would blend translucent pixels once per rect, so draw disjoint rects only
+        dirtyRects = self.mergeRects(dirtyRects)
+        for rect in dirtyRects:
+            self.clearRect(surface, background, rect)
+
+        # redraw every widget overlapping a cleared area, clipped to that area
+        for sprite in self.sprites():
+            for index in sprite.rect.collidelistall(dirtyRects):
+                clipRect = sprite.rect.clip(dirtyRects[index])
+                surface.blit(sprite.image, clipRect, clipRect.move(-sprite.rect.x, -sprite.rect.y))
+
+        for sprite in dirtySprites:
+            self.spritedict[sprite] = sprite.rect.copy()
+            if hasattr(sprite, 'dirty'): sprite.dirty = False
+
+        return dirtyRects
+
+    def discard(self, *sprites: pygame.sprite.Sprite) -> None:
+        """
+        Remove widgets for good: take them out of every group and return their pooled surfaces to surfacePool.
+        remove() keeps the surfaces so a widget can be added back
+        """
+        for sprite in sprites:
+            sprite.kill()
+            recycle(sprite)
+
+    @staticmethod
+    def mergeRects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+        """ Return rects with every group of colliding rects replaced by their union, so none overlap """
+        merged = []
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            colliding = rect.collidelistall(merged)
+            # a union can reach rects it did not touch before, keep absorbing until nothing collides
+            while colliding:
+                rect.union_ip(rect.unionall([merged[index] for index in colliding]))
+                for index in reversed(colliding):
+                    del merged[index]
+                colliding = rect.collidelistall(merged)
+            merged.append(rect)
+        return merged
+
+    def repaint(self, surface: pygame.Surface, background: ColorValue | pygame.Surface = None) -> list[pygame.Rect]:
+        """
+        Redraw whole surface and every widget, return full surface rect
+        """
+        self.clearRect(surface, self.getBackground(background), surface.get_rect())
+        for sprite in self.sprites():
+            surface.blit(sprite.image, sprite.rect)
+            self.spritedict[sprite] = sprite.rect.copy()
+            if hasattr(sprite, 'dirty'): sprite.dirty = False
+        self.lostsprites = []
+        return [surface.get_rect()]
+
+    def getBackground(self, background: ColorValue | pygame.Surface = None) -> ColorValue | pygame.Surface:
+        if background is not None:
+            return background
+        return self.background if self.background is not None else screenColor
+
+    @staticmethod
+    def clearRect(surface: pygame.Surface, background: ColorValue | pygame.Surface, rect: pygame.Rect) -> None:
+        if isinstance(background, pygame.Surface):
+            surface.blit(background, rect, rect)
+        else:
+            surface.fill(Color.mapColor(background, surface), rect)
+
+
+class SpatialGrid:
+    """ Uniform grid over widget rects for near constant time point queries """
+    def __init__(self, cellSize: int = 64) -> None:
+        self.cellSize = cellSize
+        self.cells = {}
+        self.entries = {}
+
+    def cellsFor(self, rect: pygame.Rect) -> list[tuple[int, int]]:
+        """ Return grid cells covered by rect """
+        size = self.cellSize
+        return [(cellX, cellY)
+                for cellX in range(rect.left // size, (rect.right - 1) // size + 1)
+                for cellY in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def insert(self, widget: pygame.sprite.Sprite) -> None:
+        rect = widget.rect.copy()
+        cells = self.cellsFor(rect)
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(widget)
+        self.entries[widget] = (rect, cells)
+
+    def remove(self, widget: pygame.sprite.Sprite) -> None:
+        entry = self.entries.pop(widget, None)
+        if entry is None:
+            return
+        for cell in entry[1]:
+            bucket = self.cells[cell]
+            bucket.remove(widget)
+            if not bucket: del self.cells[cell]
 
+    def update(self, widget: pygame.sprite.Sprite) -> bool:
+        """
+        Re-bucket widget if its rect moved or resized since last indexed, return true if it did
+        """
+        entry = self.entries.get(widget)
+        if entry is not None and entry[0] == widget.rect:
+            return False
+        if entry is not None:
+            cells = self.cellsFor(widget.rect)
+            if cells == entry[1]:
+                self.entries[widget] = (widget.rect.copy(), cells)
+                return True
+        self.remove(widget)
+        self.insert(widget)
+        return True
+
+    def query(self, pos: Coordinate) -> list[pygame.sprite.Sprite]:
+        """
+        Return indexed widgets whose rect contains pos
+        """
+        bucket = self.cells.get((int(pos[0]) // self.cellSize, int(pos[1]) // self.cellSize), ())
+        return [widget for widget in bucket if self.entries[widget][0].collidepoint(pos)]
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.entries.clear()
+
+
+class UIManager(DirtyGroup):
+    """
+    Dirty group that takes each frame's events once and routes them only to the widgets they concern.
+    Mouse buttons go to widgets under the pointer, motion to dragged and hovered widgets,
+    keys to the focused widget. Sprites without eventRouting still receive every event.
+    Widget animations are advanced by stepping the shared animation scheduler once per update,
+    pass dt (seconds) to update for deterministic timing.
+    """
+    keyEvents = (pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT)
+
+    def __init__(self, *sprites, background: ColorValue | pygame.Surface = None, cellSize: int = 64, swapBudget: float = 0.004) -> None:
+        self.index = SpatialGrid(cellSize)
+        self.swapBudget = swapBudget
+        self.broadcastSprites = []
+        self.focused = None
+        self.captured = []
+        self.hovered = []
+        self.animated = set()
+        self.mousePos = None
+        super().__init__(*sprites, background=background)
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        if not getattr(sprite, 'eventRouting', False):
+            self.broadcastSprites.append(sprite)
+        elif hasattr(sprite, 'checkSelect'):
+            self.index.insert(sprite)
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+        self.index.remove(sprite)
+        if sprite in self.broadcastSprites: self.broadcastSprites.remove(sprite)
+        if sprite is self.focused: self.focused = None
+        if sprite in self.captured: self.captured.remove(sprite)
+        if sprite in self.hovered: self.hovered.remove(sprite)
+        animation.scheduler.cancel_owner(sprite)
+
+    def update(self, event_list: list[pygame.event.Event], dt: float = None, **kwargs) -> None:
+        self.animated = animation.scheduler.step(dt)
+        # swap in widget images finished by render workers since the last frame
+        if renderpool.pool.pending:
+            renderpool.pool.pump(self.swapBudget)
+
+        routed = {}
+        for event in event_list:
+            for widget in self.route(event):
+                routed.setdefault(widget, []).append(event)
 
+        for sprite in self.broadcastSprites:
+            sprite.update(event_list, **kwargs)
 
+        for widget, events in routed.items():
+            widget.update(events, mousePos=self.mousePos, **kwargs)
+            self.index.update(widget)
 
+    def route(self, event: pygame.event.Event) -> list[pygame.sprite.Sprite]:
+        """
+        Return widgets that should receive event, updating focus, capture and hover state
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.mousePos = event.pos
+            targets = self.widgetsAt(event.pos)
+            self.captured.extend(widget for widget in targets if getattr(widget, 'capturesPointer', False) and widget not in self.captured)
+            previousFocus = self.focused
+            self.focused = next((widget for widget in targets if getattr(widget, 'takesFocus', False)), None)
+            if previousFocus is not None and previousFocus not in targets:
+                targets.append(previousFocus)
+            return targets
+
+        if event.type == pygame.MOUSEBUTTONUP:
+            self.mousePos = event.pos
+            targets = self.captured
+            self.captured = []
+            return targets
+
+        if event.type == pygame.MOUSEMOTION:
+            self.mousePos = event.pos
+            hovered = [widget for widget in self.widgetsAt(event.pos) if getattr(widget, 'tracksHover', False)]
+            targets = self.captured + [widget for widget in self.hovered + hovered if widget not in self.captured]
+            self.hovered = hovered
+            return list(dict.fromkeys(targets))
+
+        if event.type == pygame.MOUSEWHEEL:
+            return self.widgetsAt(getMousePos(self.mousePos))
+
+        if event.type in self.keyEvents:
+            return [self.focused] if self.focused is not None else []
+
+        return []
+
+    def widgetsAt(self, mousePos: Coordinate) -> list[pygame.sprite.Sprite]:
+        """
+        Return routed widgets whose hit area contains mousePos
+        """
+        return [widget for widget in self.index.query(mousePos) if widget.checkSelect(mousePos)]
 
-
-
-
-
+    def reindex(self, widget: pygame.sprite.Sprite = None) -> None:
+        """
+        Refresh spatial index after widgets were moved or resized outside of update
+        """
+        widgets = [widget] if widget is not None else self.index.entries
+        for widget in list(widgets):
+            self.index.update(widget)
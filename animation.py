@@ -0,0 +1,207 @@
+import pygame
+from array import array
+from os import environ
+
+environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def select(condition, a, b):
+    """ Elementwise a if condition else b, for floats and NumPy arrays alike """
+    if numpy is not None and isinstance(condition, numpy.ndarray):
+        return numpy.where(condition, a, b)
+    return a if condition else b
+
+# Easing curves map linear progress in [0, 1] to eased progress in [0, 1], for floats or NumPy arrays
+def linear(t):
+    return t
+
+def ease_in_quad(t):
+    return t * t
+
+def ease_out_quad(t):
+    return t * (2 - t)
+
+def ease_in_out_quad(t):
+    return select(t < 0.5, 2 * t * t, 1 - (-2 * t + 2) ** 2 / 2)
+
+def ease_in_cubic(t):
+    return t ** 3
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+def ease_in_out_cubic(t):
+    return select(t < 0.5, 4 * t ** 3, 1 - (-2 * t + 2) ** 3 / 2)
+
+EASINGS = {
+    'linear': linear,
+    'ease_in_quad': ease_in_quad,
+    'ease_out_quad': ease_out_quad,
+    'ease_in_out_quad': ease_in_out_quad,
+    'ease_in_cubic': ease_in_cubic,
+    'ease_out_cubic': ease_out_cubic,
+    'ease_in_out_cubic': ease_in_out_cubic,
+}
+
+def get_easing(easing):
+    """ Return easing function from a callable or a name in EASINGS """
+    return easing if callable(easing) else EASINGS[easing]
+
+
+class AnimationScheduler:
+    """
+    Holds active tweens in compact parallel arrays and advances all of them in one batched step per frame.
+    Finished tweens are swap-removed, so an idle scheduler costs a single length check per step.
+    Widgets may call step() without dt from their own update: such steps run at most once per pygame tick,
+    and not at all once the owner of the frame loop (UIManager, App) steps with an explicit dt.
+    """
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = 0
+        self.start = self.end = self.elapsed = self.duration = self.easing_index = None
+        self.grow(capacity)
+
+        self.setters = []
+        self.owners = []
+        self.callbacks = []
+        self.ids = []
+        self.easings = []
+        self.next_id = 0
+        self.last_ticks = None
+        self.driven = False
+
+    def grow(self, capacity):
+        """ Resize tween arrays to hold capacity tweens """
+        fields = ('start', 'end', 'elapsed', 'duration', 'easing_index')
+        for field in fields:
+            old = getattr(self, field)
+            kind = 'i' if field == 'easing_index' else 'd'
+            if numpy is not None:
+                new = numpy.zeros(capacity, dtype=numpy.int32 if kind == 'i' else numpy.float64)
+                if old is not None: new[:self.count] = old[:self.count]
+            else:
+                new = array(kind, [0]) * capacity
+                if old is not None: new[:self.count] = old[:self.count]
+            setattr(self, field, new)
+        self.capacity = capacity
+
+    def add(self, owner, setter, start, end, duration, easing=linear, on_complete=None):
+        """
+        Start tween calling setter(value) every step until value reaches end, return tween id.
+        setter may be the name of a method of owner, looked up at every step so that methods patched
+        on the class while the tween runs (profiling) are called
+        """
+        easing = get_easing(easing)
+        if easing not in self.easings:
+            self.easings.append(easing)
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+
+        index = self.count
+        self.start[index] = start
+        self.end[index] = end
+        self.elapsed[index] = 0
+        self.duration[index] = max(duration, 1e-6)
+        self.easing_index[index] = self.easings.index(easing)
+        self.setters.append(setter)
+        self.owners.append(owner)
+        self.callbacks.append(on_complete)
+        self.ids.append(self.next_id)
+        self.count += 1
+        self.next_id += 1
+        return self.next_id - 1
+
+    def remove_at(self, index):
+        """ Swap last tween into index to keep arrays compact """
+        last = self.count - 1
+        if index != last:
+            for field in (self.start, self.end, self.elapsed, self.duration, self.easing_index):
+                field[index] = field[last]
+            for field in (self.setters, self.owners, self.callbacks, self.ids):
+                field[index] = field[last]
+        for field in (self.setters, self.owners, self.callbacks, self.ids):
+            field.pop()
+        self.count -= 1
+
+    def cancel(self, tween_id):
+        if tween_id in self.ids:
+            self.remove_at(self.ids.index(tween_id))
+
+    def cancel_owner(self, owner):
+        """ Stop every tween belonging to owner without calling completion callbacks """
+        for index in range(self.count - 1, -1, -1):
+            if self.owners[index] is owner:
+                self.remove_at(index)
+
+    def is_active(self, owner=None):
+        if owner is None:
+            return self.count > 0
+        return any(tween_owner is owner for tween_owner in self.owners)
+
+    def step(self, dt=None):
+        """
+        Advance every tween by dt seconds (measured from pygame ticks when None), return set of owners that changed
+        """
+        ticks = pygame.time.get_ticks()
+        if dt is None:
+            # several widgets in a plain group each step once per frame, only the first one advances time
+            if self.driven or ticks == self.last_ticks:
+                return set()
+            dt = (ticks - self.last_ticks) / 1000 if self.last_ticks is not None else 0
+        else:
+            self.driven = True
+        self.last_ticks = ticks
+
+        count = self.count
+        if count == 0:
+            return set()
+
+        if numpy is not None:
+            elapsed = self.elapsed[:count]
+            elapsed += dt
+            progress = numpy.minimum(elapsed / self.duration[:count], 1)
+            eased = numpy.empty(count)
+            easing_index = self.easing_index[:count]
+            for index in numpy.unique(easing_index):
+                mask = easing_index == index
+                eased[mask] = self.easings[index](progress[mask])
+            values = (self.start[:count] + (self.end[:count] - self.start[:count]) * eased).tolist()
+            finished = numpy.flatnonzero(progress >= 1).tolist()
+        else:
+            values, finished = [], []
+            for index in range(count):
+                self.elapsed[index] += dt
+                progress = min(self.elapsed[index] / self.duration[index], 1)
+                eased = self.easings[self.easing_index[index]](progress)
+                values.append(self.start[index] + (self.end[index] - self.start[index]) * eased)
+                if progress >= 1: finished.append(index)
+
+        changed = set()
+        for setter, owner, value in zip(self.setters, self.owners, values):
+            if setter.__class__ is str:
+                setter = getattr(owner, setter)
+            setter(value)
+            changed.add(owner)
+
+        callbacks = [self.callbacks[index] for index in finished]
+        for index in reversed(finished):
+            self.remove_at(index)
+        for callback in callbacks:
+            if callback: callback()
+        return changed
+
+    def clear(self):
+        self.count = 0
+        self.setters.clear()
+        self.owners.clear()
+        self.callbacks.clear()
+        self.ids.clear()
+        self.driven = False
+
+
+scheduler = AnimationScheduler()
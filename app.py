@@ -0,0 +1,114 @@
+import pygame
+import time
+
+import animation
+import profiling
+import renderpool
+import UI
+
+class App:
+    """
+    Main loop around a UIManager that only works when something changes.
+    While a widget is dirty, a tween or transition runs or render workers are busy it ticks at fps,
+    otherwise it blocks in pygame.event.wait until input arrives or idleTimeout milliseconds pass.
+    Sprites without a dirty attribute are redrawn every frame and keep the loop at fps.
+    A replay.Recorder passed as recorder logs every frame for replay.Replayer.
+    """
+    def __init__(self, screen: pygame.Surface, manager: UI.UIManager, fps: int = 60, idleTimeout: int = 1000, onFrame = None, recorder = None) -> None:
+        self.screen = screen
+        self.manager = manager
+        self.fps = fps
+        self.idleTimeout = idleTimeout
+        self.onFrame = onFrame
+        self.recorder = recorder
+        self.clock = pygame.time.Clock()
+        self.transitions = []
+        self.running = False
+
+        self.frames = 0
+        self.idleWaits = 0
+        self.idleTime = 0.0
+
+    def play(self, transition) -> None:
+        """ Draw transition over the widgets every frame until it finishes """
+        self.transitions.append(transition)
+
+    def isBusy(self) -> bool:
+        """ Return true if the next frame has to be rendered without waiting for input """
+        if self.transitions or animation.scheduler.is_active() or renderpool.pool.pending:
+            return True
+        return any(getattr(sprite, 'dirty', True) for sprite in self.manager)
+
+    def waitForEvents(self) -> list[pygame.event.Event]:
+        """ Block until an event arrives or idleTimeout passes, return the events queued since """
+        start = time.perf_counter()
+        event = pygame.event.wait(self.idleTimeout) if self.idleTimeout else pygame.event.wait()
+        self.idleTime += time.perf_counter() - start
+        self.idleWaits += 1
+        events = [event] if event.type != pygame.NOEVENT else []
+        return events + pygame.event.get()
+
+    def step(self) -> bool:
+        """
+        Run one frame, waiting for input first when idle, return false once the app should stop
+        """
+        if self.isBusy():
+            dt = self.clock.tick(self.fps) / 1000
+            events = pygame.event.get()
+        else:
+            events = self.waitForEvents()
+            dt = self.clock.tick() / 1000
+        return self.advance(events, dt)
+
+    def advance(self, events: list[pygame.event.Event], dt: float) -> bool:
+        """
+        Update and render one frame from events and dt, return false once the app should stop.
+        step() feeds it live input, replay.Replayer recorded input
+        """
+        if self.recorder is not None:
+            self.recorder.record(events, dt)
+        if any(event.type == pygame.QUIT for event in events):
+            self.running = False
+            return False
+
+        self.manager.update(events, dt=dt)
+        if self.onFrame is not None:
+            self.onFrame(events, dt)
+        self.render(dt)
+        # close the profiler frame only after every widget has updated and rendered
+        if profiling.profiler.enabled:
+            profiling.profiler.endFrame()
+        self.frames += 1
+        return True
+
+    def render(self, dt: float) -> None:
+        if not self.transitions:
+            pygame.display.update(self.manager.draw(self.screen))
+            return
+
+        # transitions cover the whole window, so widgets are repainted underneath every frame
+        self.manager.repaint(self.screen)
+        for transition in self.transitions:
+            transition.update(dt)
+            self.screen.blit(transition.image, transition.rect)
+        self.transitions = [transition for transition in self.transitions if transition.is_transitioning()]
+        if not self.transitions:
+            self.manager.repaint(self.screen)
+        pygame.display.flip()
+
+    def run(self) -> None:
+        """ Paint the screen once and loop until QUIT or stop() """
+        self.running = True
+        pygame.display.update(self.manager.repaint(self.screen))
+        try:
+            while self.running:
+                self.step()
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def stats(self) -> dict:
+        return {'frames': self.frames, 'idleWaits': self.idleWaits, 'idleTime': self.idleTime}
@@ -0,0 +1,103 @@
+import pygame
+import UI
+
+class AtlasLabel:
+    """ Lightweight label handle pointing at a sub-rect of a shared atlas page """
+    __slots__ = ('textString', 'page', 'area', 'rect')
+
+    def __init__(self, textString: str, page: int, area: pygame.Rect, rect: pygame.Rect) -> None:
+        self.textString = textString
+        self.page = page
+        self.area = area
+        self.rect = rect
+
+
+class LabelBatch:
+    """
+    Build many static labels in one pass. Text is rendered once per distinct (font, text, color),
+    shelf packed into shared SRCALPHA atlas pages and drawn with a single Surface.blits call.
+    Specs follow the Label signature: (dest, textString, textColor, textSize) with an optional
+    dict of fontName, bold, italic and destOrientation.
+    """
+    def __init__(self, specs: list[tuple], pageSize: UI.size = (1024, 1024), padding: int = 1) -> None:
+        self.pageSize = pageSize
+        self.padding = padding
+        self.pages = []
+        self.shelves = []
+        self.renders = 0
+
+        areas = {}
+        rendered = {}
+        placed = []
+        for spec in specs:
+            dest, textString, textColor, textSize = spec[:4]
+            options = spec[4] if len(spec) > 4 else {}
+            fontKey = UI.FontRegistry.makeKey(options.get('fontName', 'Arial'), textSize, options.get('bold', False), options.get('italic', False))
+            key = (fontKey, str(textString), UI.colorKey(textColor))
+            if key not in rendered:
+                rendered[key] = UI.rasterize(UI.getFont(*fontKey), key[1], textColor)
+                self.renders += 1
+            rect = rendered[key].get_rect(**{options.get('destOrientation', 'center'): dest})
+            placed.append((key, str(textString), rect))
+
+        # pack tallest text first so shelves waste little height
+        for key in sorted(rendered, key=lambda key: rendered[key].get_height(), reverse=True):
+            areas[key] = self.pack(rendered[key])
+
+        self.trimPage()
+
+        self.handles = [AtlasLabel(textString, *areas[key], rect) for key, textString, rect in placed]
+        self.rebuild()
+
+    def pack(self, text: pygame.Surface) -> tuple[int, pygame.Rect]:
+        """
+        Copy text into the first shelf with room, opening shelves and pages as needed, return (page, area)
+        """
+        width, height = text.get_width() + self.padding, text.get_height() + self.padding
+        pageWidth, pageHeight = max(self.pageSize[0], width), max(self.pageSize[1], height)
+        for page, shelves in enumerate(self.shelves):
+            for shelf in shelves:
+                if height <= shelf[1] and shelf[2] + width <= self.pages[page].get_width():
+                    return self.blitInto(page, shelf, text)
+            shelfTop = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if shelfTop + height <= self.pages[page].get_height() and width <= self.pages[page].get_width():
+                shelves.append([shelfTop, height, 0])
+                return self.blitInto(page, shelves[-1], text)
+
+        self.pages.append(UI.convertSurface(UI.newSurface((pageWidth, pageHeight), pygame.SRCALPHA), True))
+        self.pages[-1].fill((0, 0, 0, 0))
+        self.shelves.append([[0, height, 0]])
+        return self.blitInto(len(self.pages) - 1, self.shelves[-1][0], text)
+
+    def blitInto(self, page: int, shelf: list, text: pygame.Surface) -> tuple[int, pygame.Rect]:
+        area = text.get_rect(topleft = (shelf[2], shelf[0]))
+        self.pages[page].blit(text, area)
+        shelf[2] += area.width + self.padding
+        return page, area
+
+    def trimPage(self) -> None:
+        """ Shrink the last page to the shelves actually used """
+        if not self.pages:
+            return
+        shelves = self.shelves[-1]
+        usedHeight = shelves[-1][0] + shelves[-1][1]
+        usedWidth = max(shelf[2] for shelf in shelves)
+        page = self.pages[-1]
+        if usedHeight < page.get_height() or usedWidth < page.get_width():
+            self.pages[-1] = UI.copySurface(page.subsurface((0, 0, max(1, usedWidth), max(1, usedHeight))))
+
+    def rebuild(self) -> None:
+        """ Refresh the blit sequence after handles were moved """
+        self.sequence = [(self.pages[handle.page], handle.rect, handle.area) for handle in self.handles]
+        self.rect = self.handles[0].rect.unionall([handle.rect for handle in self.handles]) if self.handles else pygame.Rect(0, 0, 0, 0)
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        """ Draw every label in one blits call, return area covered """
+        surface.blits(self.sequence, doreturn=False)
+        return self.rect
+
+    def bytes(self) -> int:
+        return sum(UI.TextCache.surfaceBytes(page) for page in self.pages)
+
+    def stats(self) -> dict:
+        return {'labels': len(self.handles), 'renders': self.renders, 'pages': len(self.pages), 'bytes': self.bytes()}
@@ -0,0 +1,57 @@
+""" Compare repaint cost of widgets in their chosen blit formats against the same images as per-pixel alpha """
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+import profiling
+
+SCREEN_SIZE = (1280, 720)
+FRAMES = 20
+
+def buildWidgets(count: int) -> list[pygame.sprite.Sprite]:
+    """ Mix of transparent, opaque and rounded labels with buttons, spread over the screen """
+    kinds = [
+        lambda pos, i: UI.Label(pos, f'Item {i}', Color.WHITE, 14),
+        lambda pos, i: UI.Label(pos, f'Value {i}', Color.WHITE, 14, transparent=False, margin=[8, 4]),
+        lambda pos, i: UI.Label(pos, f'Tag {i % 50}', Color.WHITE, 12, textBackgroundColor=Color.BLUE, textBackgroundRounded=6, margin=[12, 6]),
+        lambda pos, i: UI.Button(pos[0], pos[1], f'Go {i % 20}', 16, lambda: None),
+    ]
+    return [kinds[i % len(kinds)](((i * 97) % SCREEN_SIZE[0], (i * 53) % SCREEN_SIZE[1]), i) for i in range(count)]
+
+def timeRepaint(group: UI.DirtyGroup, screen: pygame.Surface) -> float:
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        group.repaint(screen)
+    return (time.perf_counter() - start) / FRAMES
+
+def run(counts: list[int]) -> None:
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'widgets':>8} {'alpha ms':>9} {'policy ms':>10} {'slow before':>12} {'slow after':>11}")
+    for count in counts:
+        widgets = buildWidgets(count)
+        group = UI.DirtyGroup(*widgets)
+        optimized = [widget.image for widget in widgets]
+
+        # every image as per-pixel alpha, as widgets were built before the format policy
+        for widget in widgets:
+            widget.image = widget.image.convert_alpha()
+        slowBefore = len(profiling.slowBlits(widgets))
+        alphaTime = timeRepaint(group, screen)
+
+        for widget, image in zip(widgets, optimized):
+            widget.image = image
+        slowAfter = len(profiling.slowBlits(widgets))
+        policyTime = timeRepaint(group, screen)
+        print(f"{count:>8} {alphaTime * 1e3:>9.2f} {policyTime * 1e3:>10.2f} {slowBefore:>12} {slowAfter:>11}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [500, 5000])
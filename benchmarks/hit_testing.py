@@ -0,0 +1,52 @@
+""" Compare linear checkSelect scans against the UIManager spatial grid for hit-testing """
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import UI
+
+SCREEN_SIZE = (1280, 720)
+QUERIES = 2000
+
+def buildWidgets(count: int) -> list[pygame.sprite.Sprite]:
+    """ Scatter sliders and buttons over an editor sized canvas """
+    rng = random.Random(count)
+    width, height = SCREEN_SIZE[0] * 4, SCREEN_SIZE[1] * 4
+    widgets = []
+    for i in range(count):
+        x, y = rng.randrange(width), rng.randrange(height)
+        if i % 2:
+            widgets.append(UI.Slider([x, y], [100, 5], 6, [0, 100]))
+        else:
+            widgets.append(UI.Button(x, y, 'Button', 14, lambda: None))
+    return widgets
+
+def timeQueries(hitTest, points: list[UI.Coordinate]) -> float:
+    start = time.perf_counter()
+    for point in points:
+        hitTest(point)
+    return (time.perf_counter() - start) / len(points)
+
+def run(counts: list[int]) -> None:
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'widgets':>8} {'linear us':>10} {'grid us':>10} {'speedup':>8}")
+    for count in counts:
+        widgets = buildWidgets(count)
+        manager = UI.UIManager(*widgets)
+        rng = random.Random(0)
+        points = [(rng.randrange(SCREEN_SIZE[0] * 4), rng.randrange(SCREEN_SIZE[1] * 4)) for _ in range(QUERIES)]
+
+        linear = timeQueries(lambda pos: [widget for widget in widgets if widget.checkSelect(pos)], points)
+        grid = timeQueries(manager.widgetsAt, points)
+        print(f"{count:>8} {linear * 1e6:>10.2f} {grid * 1e6:>10.2f} {linear / grid:>7.1f}x")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000])
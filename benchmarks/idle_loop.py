@@ -0,0 +1,97 @@
+""" Compare CPU use and input wake latency of a fixed 60 fps loop against the idle-aware App runner """
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import UI
+from app import App
+
+SCREEN_SIZE = (1280, 720)
+DURATION = 3.0
+PROBE_INTERVAL = 0.1
+
+def buildScreen(count: int) -> UI.UIManager:
+    widgets = [UI.Slider([100 + (i % 10) * 110, 40 + (i // 10) * 30], [80, 5], 6, [0, 100]) for i in range(count // 2)]
+    widgets += [UI.Button(100 + (i % 10) * 110, 400 + (i // 10) * 20, 'OK', 12, lambda: None) for i in range(count - count // 2)]
+    return UI.UIManager(*widgets)
+
+def probe(stop: threading.Event) -> None:
+    """ Post timestamped user events, as input arriving while the loop is sleeping """
+    while not stop.wait(PROBE_INTERVAL):
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT, sent=time.perf_counter()))
+
+def measure(loop) -> tuple[float, float, float]:
+    """ Run loop(onFrame, deadline) for DURATION, return (cpu percent, mean latency ms, max latency ms) """
+    latencies = []
+
+    def onFrame(events, dt) -> None:
+        now = time.perf_counter()
+        latencies.extend(now - event.sent for event in events if event.type == pygame.USEREVENT)
+
+    pygame.event.clear()
+    stop = threading.Event()
+    thread = threading.Thread(target=probe, args=(stop,), daemon=True)
+    thread.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    loop(onFrame, wall + DURATION)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stop.set()
+    thread.join()
+    return cpu / wall * 100, sum(latencies) / max(1, len(latencies)) * 1e3, max(latencies, default=0) * 1e3
+
+def fixedLoop(screen: pygame.Surface, manager: UI.UIManager, fullRedraw: bool):
+    """ The loop pygameTesting.py used before the App runner, optionally repainting everything each frame """
+    def loop(onFrame, deadline) -> None:
+        clock = pygame.time.Clock()
+        pygame.display.update(manager.repaint(screen))
+        while time.perf_counter() < deadline:
+            dt = clock.tick(60) / 1000
+            events = pygame.event.get()
+            manager.update(events)
+            onFrame(events, dt)
+            if fullRedraw:
+                pygame.display.update(manager.repaint(screen))
+            else:
+                pygame.display.update(manager.draw(screen))
+    return loop
+
+def appLoop(screen: pygame.Surface, manager: UI.UIManager, animate: bool):
+    def loop(onFrame, deadline) -> None:
+        switch = UI.Switch((640, 650), 100, 50, knobSpeed=200)
+        manager.add(switch)
+
+        def frame(events, dt) -> None:
+            onFrame(events, dt)
+            # keep the switch knob moving back and forth for the active case
+            if animate and not switch.isAnimating():
+                switch.clicked = not switch.clicked
+                switch.startKnobTween()
+            if time.perf_counter() >= deadline:
+                app.stop()
+
+        app = App(screen, manager, fps=60, idleTimeout=250, onFrame=frame)
+        app.run()
+        manager.discard(switch)
+    return loop
+
+def run(count: int) -> None:
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    manager = buildScreen(count)
+    print(f"{'loop':>22} {'cpu %':>7} {'wake ms':>8} {'max ms':>8}")
+    for name, loop in [('fixed 60 fps, repaint', fixedLoop(screen, manager, True)),
+                       ('fixed 60 fps, dirty', fixedLoop(screen, manager, False)),
+                       ('App idle', appLoop(screen, manager, False)),
+                       ('App animating', appLoop(screen, manager, True))]:
+        cpu, latency, worst = measure(loop)
+        print(f"{name:>22} {cpu:>7.1f} {latency:>8.2f} {worst:>8.2f}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,53 @@
+""" Compare individual Label objects against an atlas LabelBatch for a static text grid """
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+import atlas
+
+SCREEN_SIZE = (1280, 720)
+FRAMES = 20
+
+def buildSpecs(count: int) -> list[tuple]:
+    """ Spreadsheet-like grid of numeric cells, many values repeat """
+    columns = 50
+    return [((20 + (i % columns) * 25, 10 + (i // columns) * 7), str(i * 7 % 997), Color.WHITE, 10) for i in range(count)]
+
+def timeDraw(draw) -> float:
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        draw()
+    return (time.perf_counter() - start) / FRAMES
+
+def run(counts: list[int]) -> None:
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'labels':>7} {'Label ms':>9} {'batch ms':>9} {'Label MB':>9} {'batch MB':>9} {'Label draw':>11} {'batch draw':>11} {'renders':>8}")
+    for count in counts:
+        specs = buildSpecs(count)
+        UI.textCache.clear()
+        start = time.perf_counter()
+        labels = [UI.Label(*spec) for spec in specs]
+        labelBuild = time.perf_counter() - start
+        labelBytes = sum(UI.TextCache.surfaceBytes(label.image) + UI.TextCache.surfaceBytes(label.original_image) for label in labels)
+        group = pygame.sprite.Group(*labels)
+
+        start = time.perf_counter()
+        batch = atlas.LabelBatch(specs)
+        batchBuild = time.perf_counter() - start
+
+        labelDraw = timeDraw(lambda: group.draw(screen))
+        batchDraw = timeDraw(lambda: batch.draw(screen))
+        print(f"{count:>7} {labelBuild * 1e3:>9.1f} {batchBuild * 1e3:>9.1f} {labelBytes / 2**20:>9.2f} {batch.bytes() / 2**20:>9.2f} "
+              f"{labelDraw * 1e3:>9.2f}ms {batchDraw * 1e3:>9.2f}ms {batch.renders:>8}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [500, 5000, 20000])
@@ -0,0 +1,59 @@
+""" Time full and incremental layout passes over a screen of widgets while the window is resized """
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+import layout
+
+SCREEN_SIZE = (1280, 720)
+RESIZES = 50
+
+def buildScreen(count: int) -> tuple[layout.Layout, list[pygame.sprite.Sprite]]:
+    """ Centered grid of panels, each a column of a label, a slider and a button row """
+    widgets = []
+    panels = []
+    for i in range(count // 4):
+        label = UI.Label([0, 0], f'Panel {i}', Color.WHITE, 12)
+        slider = UI.Slider([0, 0], [80, 5], 5, [0, 100])
+        buttons = [UI.Button(0, 0, 'OK', 12, lambda: None), UI.Button(0, 0, 'Cancel', 12, lambda: None)]
+        widgets += [label, slider, *buttons]
+        panels.append(layout.Column(label, slider, layout.Row(*buttons, spacing=4), spacing=4, margin=4))
+    manager = UI.UIManager(*widgets)
+    grid = layout.Grid(*panels, columns=int(len(panels) ** 0.5) + 1, expand=False, fill=False)
+    return layout.Layout(layout.Anchor(grid), manager=manager), widgets
+
+def run(counts: list[int]) -> None:
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'widgets':>8} {'first ms':>9} {'resize ms':>10} {'moved':>6} {'one widget ms':>14} {'moved':>6} {'renders':>8}")
+    for count in counts:
+        screen, widgets = buildScreen(count)
+        start = time.perf_counter()
+        screen.resize(SCREEN_SIZE)
+        first = time.perf_counter() - start
+
+        renders = UI.textRenders + UI.surfaceAllocations
+        start = time.perf_counter()
+        for step in range(RESIZES):
+            moved = screen.resize((SCREEN_SIZE[0] + step * 8 + 8, SCREEN_SIZE[1] + step * 4 + 4))
+        resize = (time.perf_counter() - start) / RESIZES
+
+        target = widgets[len(widgets) // 2]
+        target.rect.width += 10
+        start = time.perf_counter()
+        screen.invalidate(target)
+        local = screen.layout()
+        incremental = time.perf_counter() - start
+        renders = UI.textRenders + UI.surfaceAllocations - renders
+        print(f"{count:>8} {first * 1e3:>9.2f} {resize * 1e3:>10.2f} {len(moved):>6} {incremental * 1e3:>14.3f} {len(local):>6} {renders:>8}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000])
@@ -0,0 +1,80 @@
+""" Record a synthetic session of pointer sweeps, slider drags and typing, then replay it headlessly as fast as possible """
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+import replay
+from app import App
+
+SCREEN_SIZE = (1280, 720)
+FPS = 60
+
+def buildScreen(screen: pygame.Surface) -> UI.UIManager:
+    return UI.UIManager(
+        UI.InputField((640, 150), 'Name', Color.WHITE, 20, Color.WHITE, 16, inputWidth=[300, 30]),
+        UI.Slider((640, 350), [400, 5], 7.5, [0, 100]),
+        UI.Switch((640, 500), 100, 50),
+        UI.Label((640, 650), 'Replay', Color.WHITE, 18),
+    )
+
+def sessionFrames(seconds: int):
+    """ Yield (events, mousePos) per frame: idle stretches, pointer sweeps, a slider drag and a typed word every few seconds """
+    manager = buildScreen(None)
+    field, slider, switch = manager.sprites()[:3]
+    knob = slider.sliderCircle.move(slider.rect.topleft).center
+    for frame in range(seconds * FPS):
+        phase = frame % (FPS * 5)
+        pos = (frame * 7 % SCREEN_SIZE[0], 300)
+        events = []
+        if phase < FPS:
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(7, 0), buttons=(0, 0, 0)))
+        elif phase == FPS:
+            pos = knob
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        elif phase < FPS + 30:
+            pos = (knob[0] + (phase - FPS) * 4, knob[1])
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(4, 0), buttons=(1, 0, 0)))
+        elif phase == FPS + 30:
+            pos = knob
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+        elif phase == FPS * 2:
+            pos = field.rect.center
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        elif FPS * 2 < phase <= FPS * 2 + 5:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, unicode='a', mod=0, scancode=4))
+        elif phase == FPS * 3:
+            pos = switch.rect.center
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        yield events, pos
+
+def run(seconds: int) -> None:
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    path = os.path.join(tempfile.mkdtemp(), 'session.pgr')
+
+    start = time.perf_counter()
+    with replay.Recorder(path, SCREEN_SIZE) as recorder:
+        for events, pos in sessionFrames(seconds):
+            recorder.record(events, 1 / FPS, pos)
+        written = recorder.stats()
+    recordTime = time.perf_counter() - start
+    print(f"recorded {written['frames']} frames, {written['events']} events in {recordTime:.2f} s, {written['bytes'] / 1024:.1f} KB")
+
+    replayer = replay.Replayer(path)
+    stats = replayer.run(App(screen, buildScreen(screen)))
+    print(f"replayed {stats['sessionSeconds']:.0f} s session in {stats['wallSeconds']:.2f} s")
+    print(f"frame mean {stats['meanMs']:.3f} ms  p99 {stats['p99Ms']:.3f} ms  max {stats['maxMs']:.3f} ms")
+    for index, sessionSeconds, frameMs in stats['outliers'][:5]:
+        print(f'  frame {index:>8} at {sessionSeconds:>9.2f} s  {frameMs:8.3f} ms')
+    pygame.quit()
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3600)
@@ -0,0 +1,57 @@
+""" Compare pygame.draw.rect against drawRoundedRect with cached corners for styled control backgrounds """
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+
+SCREEN_SIZE = (1280, 720)
+REPEATS = 5
+
+def shapes(count: int, distinct: bool) -> list[tuple]:
+    """
+    (color, rect, border width, radius) of control backgrounds in a handful of styles,
+    in a handful of sizes or with nearly every size distinct
+    """
+    rng = random.Random(count)
+    specs = []
+    for _ in range(count):
+        if distinct:
+            size = (rng.randrange(40, 280), rng.randrange(20, 60))
+        else:
+            size = (rng.choice([60, 80, 120, 250]), rng.choice([20, 30, 50]))
+        specs.append((Color.DIMGRAY, pygame.Rect((rng.randrange(1000), rng.randrange(620)), size), rng.choice([0, 2]), rng.choice([5, 10, 25])))
+    return specs
+
+def drawAll(surface: pygame.Surface, specs: list[tuple], draw) -> float:
+    start = time.perf_counter()
+    for color, rect, width, radius in specs:
+        draw(surface, color, rect, width, radius)
+    return time.perf_counter() - start
+
+def run(counts: list[int]) -> None:
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'controls':>9} {'sizes':>9} {'draw ms':>9} {'cold ms':>9} {'warm ms':>9} {'rasterized':>11}")
+    for count, distinct in [(count, distinct) for count in counts for distinct in (False, True)]:
+        specs = shapes(count, distinct)
+        # best of REPEATS runs, the cache is cleared before each cold pass
+        direct, cold, warm = [], [], []
+        for _ in range(REPEATS):
+            direct.append(drawAll(screen, specs, pygame.draw.rect))
+            UI.shapeCache.clear()
+            cold.append(drawAll(screen, specs, UI.drawRoundedRect))
+            rasterized = UI.shapeCache.stats()['rasterized']
+            warm.append(drawAll(screen, specs, UI.drawRoundedRect))
+        print(f"{count:>9} {'distinct' if distinct else 'repeated':>9} {min(direct) * 1e3:>9.2f} {min(cold) * 1e3:>9.2f} {min(warm) * 1e3:>9.2f} {rasterized:>11}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,76 @@
+""" Measure Slider drag cost per frame for different numbers of motion events per frame, per-event redraw against coalesced layers """
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+
+SCREEN_SIZE = (1280, 720)
+FRAMES = 300
+
+class PerEventSlider(UI.Slider):
+    """ Slider with the drag path it had before layering: every motion event redraws the image and renders a hover tag """
+    def update(self, event_list: list[pygame.event.Event], **kwargs) -> None:
+        for event in event_list:
+            if event.type == pygame.MOUSEBUTTONDOWN and self.checkSelect(event.pos):
+                self.clicked = True
+            if self.clicked and event.type == pygame.MOUSEBUTTONUP:
+                self.clicked = False
+                if self.hover:
+                    self.image = self.non_hover_image
+                    self.dirty = True
+            if self.clicked and event.type == pygame.MOUSEMOTION:
+                self.image = self.original_image.copy()
+                self.dirty = True
+
+                mousePos = self.getRelativeMousePos(event.pos)
+                self.currentValue = self.getCurrentValue(mousePos[0])
+                self.sliderCircle = pygame.draw.circle(self.image, self.circleColor, self.calcCircleCenter(mousePos), self.circleRadius)
+                if self.circleOutlineColor:
+                    pygame.draw.circle(self.image, self.circleOutlineColor, mousePos, self.circleRadius, self.circleOutlineWidth)
+
+                if self.hover:
+                    self.non_hover_image = self.image.copy()
+                    hoverMidTop = [self.sliderCircle.centerx, self.sliderCircle.bottom + self.sliderLabelGap]
+                    hoverTag = UI.Label(hoverMidTop, int(self.currentValue), self.hoverColor, 10, destOrientation='midtop',
+                                        textBackgroundColor=Color.RED, textBackgroundRounded=2, margin=[10,0])
+                    self.image.blit(hoverTag.image, hoverTag.rect)
+
+def dragFrames(eventsPerFrame: int, sliderClass: type = UI.Slider) -> float:
+    """ Return mean seconds per frame while dragging a slider back and forth """
+    screen = pygame.display.get_surface()
+    slider = sliderClass([SCREEN_SIZE[0]//2, SCREEN_SIZE[1]//2], [300, 5], 7.5, [0, 100])
+    group = UI.DirtyGroup(slider)
+    group.repaint(screen)
+
+    left = slider.rect.centerx - 150
+    y = slider.rect.centery
+    group.update([pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(left, y), button=1)])
+
+    x = left
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        events = []
+        for _ in range(eventsPerFrame):
+            x = left + (x - left + 3) % 300
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(3, 0), buttons=(1, 0, 0)))
+        group.update(events)
+        group.draw(screen)
+    return (time.perf_counter() - start) / FRAMES
+
+def run(eventCounts: list[int]) -> None:
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'events/frame':>12} {'per-event ms':>13} {'coalesced ms':>13}")
+    for count in eventCounts:
+        print(f"{count:>12} {dragFrames(count, PerEventSlider) * 1e3:>13.3f} {dragFrames(count) * 1e3:>13.3f}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [1, 8, 32])
@@ -0,0 +1,212 @@
+"""
+Headless throughput benchmark for UI.py widgets and transitions.
+
+Builds N instances of each widget, feeds synthetic event streams (typing, drags, clicks)
+and reports per-widget update/draw cost, surface allocations, text renders and frames per second.
+
+    SDL_VIDEODRIVER=dummy python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline results.json --tolerance 0.25
+
+Every metric is the median of --repeats runs. With --baseline the run exits with status 1 if any metric
+regressed past the tolerance and by more than the metric's absolute floor.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+import transitions
+
+SCREEN_SIZE = (1280, 720)
+DEFAULT_COUNTS = [10, 100, 1000, 10000]
+TIME_METRICS = ['updateUsPerWidget', 'drawUsPerWidget', 'frameMs']
+COUNT_METRICS = ['allocationsPerFrame', 'textRendersPerFrame']
+# smallest change that counts as a regression, below it run to run noise dominates the relative tolerance
+ABSOLUTE_FLOORS = {'updateUsPerWidget': 0.5, 'drawUsPerWidget': 0.5, 'frameMs': 0.1,
+                   'allocationsPerFrame': 0.5, 'textRendersPerFrame': 0.5}
+
+def gridPositions(count: int) -> list[tuple[int, int]]:
+    """ Spread count positions over the screen in a near square grid """
+    columns = max(1, int(count ** 0.5 * SCREEN_SIZE[0] / SCREEN_SIZE[1]))
+    rows = (count + columns - 1) // columns
+    cellW, cellH = SCREEN_SIZE[0] / columns, SCREEN_SIZE[1] / max(rows, 1)
+    return [(int((i % columns + 0.5) * cellW), int((i // columns + 0.5) * cellH)) for i in range(count)]
+
+def event(eventType: int, **attributes) -> pygame.event.Event:
+    return pygame.event.Event(eventType, **attributes)
+
+def click(pos) -> list[pygame.event.Event]:
+    return [event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)),
+            event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+            event(pygame.MOUSEBUTTONUP, pos=pos, button=1)]
+
+# each scenario: (build widget at position, events for frame number given the widget list)
+def typingEvents(frame: int, widgets: list) -> list:
+    field = widgets[(frame // 20) % len(widgets)]
+    if frame % 20 == 0:
+        return [event(pygame.MOUSEBUTTONDOWN, pos=(field.rect.centerx, field.rect.bottom - 3), button=1)]
+    char = 'abcdefghij'[frame % 10]
+    return [event(pygame.KEYDOWN, key=ord(char), unicode=char, mod=0) for _ in range(2)]
+
+def dragEvents(frame: int, widgets: list) -> list:
+    slider = widgets[(frame // 30) % len(widgets)]
+    left = slider.rect.left + slider.sliderBar.left
+    y = slider.rect.top + slider.sliderBar.centery
+    phase = frame % 30
+    if phase == 0:
+        return [event(pygame.MOUSEBUTTONDOWN, pos=(slider.rect.left + slider.sliderCircle.centerx, y), button=1)]
+    if phase == 29:
+        return [event(pygame.MOUSEBUTTONUP, pos=(left, y), button=1)]
+    return [event(pygame.MOUSEMOTION, pos=(left + (phase * 4 + step) % slider.sliderWidth, y), rel=(1, 0), buttons=(1, 0, 0))
+            for step in range(4)]
+
+def clickEvents(frame: int, widgets: list) -> list:
+    return click(widgets[frame % len(widgets)].rect.center) if frame % 4 == 0 else []
+
+def noEvents(frame: int, widgets: list) -> list:
+    return []
+
+SCENARIOS = {
+    'Label': (lambda pos: UI.Label(pos, 'Label text', Color.WHITE, 14), noEvents),
+    'InputField': (lambda pos: UI.InputField(pos, 'Name', Color.WHITE, 12, Color.WHITE, 12, placeHolderText='type here',
+                                             inputBackgroundColor=Color.DIMGRAY, inputWidth=[120, 20], inputMargin=[5, 2]), typingEvents),
+    'Slider': (lambda pos: UI.Slider(list(pos), [100, 5], 6, [0, 100]), dragEvents),
+    'Table': (lambda pos: UI.Table(pos, ['alpha', 'beta', 'gamma'], Color.WHITE, 12, 'Arial'), noEvents),
+    'Switch': (lambda pos: UI.Switch(pos, 40, 20), clickEvents),
+    'Button': (lambda pos: UI.Button(pos[0], pos[1], 'Press', 14, lambda: None), clickEvents),
+}
+
+def runScenario(name: str, count: int, frames: int, mode: str) -> dict:
+    build, events = SCENARIOS[name]
+    screen = pygame.display.get_surface()
+
+    buildStart = time.perf_counter()
+    widgets = [build(pos) for pos in gridPositions(count)]
+    buildMs = (time.perf_counter() - buildStart) * 1e3
+
+    group = UI.UIManager(*widgets) if mode == 'manager' else pygame.sprite.Group(*widgets)
+    if mode == 'manager': group.repaint(screen)
+
+    return measureFrames(group, lambda frame: group.update(events(frame, widgets), dt=1/60) if mode == 'manager' else group.update(events(frame, widgets)),
+                         lambda: group.draw(screen) if mode == 'manager' else (screen.fill(UI.screenColor), group.draw(screen)),
+                         count, frames, buildMs)
+
+def runTransition(count: int, frames: int) -> dict:
+    screen = pygame.display.get_surface()
+    buildStart = time.perf_counter()
+    swipes = [transitions.HorizontalRectangleSwipeTransition(rect_count=6, duration=frames / 60 * 2) for _ in range(min(count, 10))]
+    buildMs = (time.perf_counter() - buildStart) * 1e3
+
+    def update(frame):
+        for swipe in swipes: swipe.update(1/60)
+
+    def draw():
+        for swipe in swipes: screen.blit(swipe.image, swipe.rect)
+
+    return measureFrames(None, update, draw, len(swipes), frames, buildMs)
+
+def measureFrames(group, update, draw, count: int, frames: int, buildMs: float) -> dict:
+    warmup = min(10, frames)
+    for frame in range(warmup):
+        update(frame); draw()
+
+    updateTimes, drawTimes = [], []
+    # UI counts every surface it allocates, copies or converts and every text rasterization
+    allocations, textRenders = UI.surfaceAllocations, UI.textRenders
+    for frame in range(warmup, warmup + frames):
+        start = time.perf_counter()
+        update(frame)
+        middle = time.perf_counter()
+        draw()
+        updateTimes.append(middle - start)
+        drawTimes.append(time.perf_counter() - middle)
+
+    updateMean, drawMean = statistics.fmean(updateTimes), statistics.fmean(drawTimes)
+    return {
+        'widgets': count,
+        'buildMs': round(buildMs, 3),
+        'updateUsPerWidget': round(updateMean / count * 1e6, 4),
+        'drawUsPerWidget': round(drawMean / count * 1e6, 4),
+        'frameMs': round((updateMean + drawMean) * 1e3, 4),
+        'fps': round(1 / max(updateMean + drawMean, 1e-9), 1),
+        'allocationsPerFrame': round((UI.surfaceAllocations - allocations) / frames, 3),
+        'textRendersPerFrame': round((UI.textRenders - textRenders) / frames, 3),
+    }
+
+def runSuite(counts: list[int], frames: int, names: list[str], mode: str, repeats: int = 3) -> dict:
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+    results = {'meta': {'pygame': pygame.version.ver, 'mode': mode, 'frames': frames, 'repeats': repeats, 'screen': SCREEN_SIZE},
+               'results': {}}
+    for name in names:
+        results['results'][name] = {}
+        for count in counts:
+            runs = []
+            for _ in range(repeats):
+                UI.textCache.clear()
+                if name == 'HorizontalRectangleSwipeTransition':
+                    runs.append(runTransition(count, frames))
+                else:
+                    runs.append(runScenario(name, count, frames, mode))
+            metrics = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+            results['results'][name][str(count)] = metrics
+            print(f"{name:>36} {count:>6} update {metrics['updateUsPerWidget']:>9.3f}us/w  draw {metrics['drawUsPerWidget']:>9.3f}us/w  "
+                  f"{metrics['fps']:>9.1f} fps  alloc {metrics['allocationsPerFrame']:>7.2f}/f  text {metrics['textRendersPerFrame']:>6.2f}/f")
+    pygame.quit()
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """ Return descriptions of metrics that regressed past tolerance relative to baseline and past their absolute floor """
+    regressions = []
+    for name, byCount in results['results'].items():
+        for count, metrics in byCount.items():
+            reference = baseline.get('results', {}).get(name, {}).get(count)
+            if reference is None:
+                continue
+            for metric in TIME_METRICS + COUNT_METRICS:
+                old, new = reference[metric], metrics[metric]
+                if new > old * (1 + tolerance) and new - old > ABSOLUTE_FLOORS[metric]:
+                    regressions.append(f'{name}[{count}] {metric}: {old} -> {new}')
+    return regressions
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', type=int, nargs='+', default=DEFAULT_COUNTS)
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--repeats', type=int, default=3, help='runs per widget count, metrics are their median')
+    parser.add_argument('--widgets', nargs='+', default=list(SCENARIOS) + ['HorizontalRectangleSwipeTransition'])
+    parser.add_argument('--mode', choices=['manager', 'group'], default='manager',
+                        help='route events through UIManager with dirty drawing, or plain Group.update/draw')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--baseline', help='compare against results JSON stored earlier')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown before failing')
+    args = parser.parse_args(argv)
+
+    results = runSuite(args.counts, args.frames, args.widgets, args.mode, args.repeats)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print('\nREGRESSIONS:')
+            for line in regressions:
+                print('  ' + line)
+            return 1
+        print('\nno regressions against baseline')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
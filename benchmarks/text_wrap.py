@@ -0,0 +1,54 @@
+""" Measure wrapped Label cost for a growing chat log: full rebuild against incremental setText """
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+
+WORDS = ['ok', 'the', 'render', 'queue', 'is', 'empty', 'again,', 'restarting', 'worker', 'pool', 'after', 'frame', 'budget', 'ran', 'out']
+
+def messages(totalBytes: int) -> list[str]:
+    """ Chat lines of a few to a few dozen words until totalBytes of text """
+    rng = random.Random(totalBytes)
+    lines, size = [], 0
+    while size < totalBytes:
+        line = f'user{rng.randrange(9)}: ' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 40)))
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+def run(sizes: list[int], wrapWidth: int = 400) -> None:
+    pygame.init()
+    pygame.display.set_mode((1280, 720))
+    print(f"{'bytes':>7} {'lines':>6} {'build ms':>9} {'append med':>11} {'append max':>11} {'edit top ms':>12}")
+    for totalBytes in sizes:
+        chat = messages(totalBytes)
+        UI.wrapCache.clear()
+        start = time.perf_counter()
+        label = UI.Label((0, 0), '\n'.join(chat), Color.WHITE, 14, wrapWidth=wrapWidth, destOrientation='topleft')
+        build = time.perf_counter() - start
+
+        log = UI.Label((0, 0), chat[0], Color.WHITE, 14, wrapWidth=wrapWidth, destOrientation='topleft')
+        appends = []
+        for count in range(2, len(chat) + 1):
+            start = time.perf_counter()
+            log.setText('\n'.join(chat[:count]))
+            appends.append(time.perf_counter() - start)
+        appends.sort()
+
+        start = time.perf_counter()
+        label.setText('edited ' + label.textString)
+        edit = time.perf_counter() - start
+        lines = sum(map(len, label.paragraphLines))
+        print(f"{totalBytes:>7} {lines:>6} {build * 1e3:>9.2f} {appends[len(appends) // 2] * 1e3:>11.2f} {appends[-1] * 1e3:>11.2f} {edit * 1e3:>12.2f}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [5000, 50000])
@@ -0,0 +1,78 @@
+""" Measure Python heap and surface bytes per widget for large numbers of Labels and Sliders, with and without shared styles """
+import gc
+import inspect
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import Color
+import UI
+
+SCREEN_SIZE = (1280, 720)
+
+def copyingLocals(cls: type) -> type:
+    """
+    Return subclass of widget cls that keeps its state the way widgets did before Style:
+    a copy of the constructor's locals() (arguments, kwargs and self) and every setting on the instance,
+    and for Labels a pooled copy of the rendered image
+    """
+    class CopyingLocals(cls):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            self.__dict__.update(inspect.signature(cls.__init__).bind(self, *args, **kwargs).arguments)
+            self.__dict__.update(self.style.fields)
+            if isinstance(self, UI.Label):
+                self.image = UI.surfacePool.copy(self.original_image)
+    return CopyingLocals
+
+def factories(name: str) -> dict:
+    """ Return (locals copy, shared style) factories building widget name number i """
+    if name == 'Label':
+        return {layout: lambda i, cls=cls: cls([i % 1280, i % 720], str(i % 100), Color.WHITE, 12, margin=[4, 2])
+                for layout, cls in (('locals', copyingLocals(UI.Label)), ('style', UI.Label))}
+    return {layout: lambda i, cls=cls: cls([i % 1280, i % 720], [100, 5], 6, [0, 100])
+            for layout, cls in (('locals', copyingLocals(UI.Slider)), ('style', UI.Slider))}
+
+def surfaceBytes(widgets: list) -> int:
+    """ Bytes of pixel data owned by widgets, shared surfaces counted once """
+    seen = {}
+    for widget in widgets:
+        for value in vars(widget).values():
+            if isinstance(value, pygame.Surface):
+                seen[id(value)] = UI.TextCache.surfaceBytes(value)
+            elif isinstance(value, dict):
+                for item in value.values():
+                    if isinstance(item, pygame.Surface):
+                        seen[id(item)] = UI.TextCache.surfaceBytes(item)
+    return sum(seen.values())
+
+def measure(factory, count: int) -> tuple[float, float, int]:
+    """ Return (heap bytes per widget, surface bytes per widget, instance attributes) """
+    factory(0)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    widgets = [factory(i) for i in range(count)]
+    gc.collect()
+    heap = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return heap / count, surfaceBytes(widgets) / count, len(vars(widgets[0]))
+
+def run(counts: list[int]) -> None:
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+    print(f"{'widget':>7} {'state':>7} {'count':>7} {'heap B/w':>9} {'surface B/w':>12} {'attrs':>6}")
+    for name in ('Label', 'Slider'):
+        for layout, factory in factories(name).items():
+            for count in counts:
+                heap, surface, attrs = measure(factory, count)
+                print(f"{name:>7} {layout:>7} {count:>7} {heap:>9.0f} {surface:>12.0f} {attrs:>6}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
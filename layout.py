@@ -0,0 +1,267 @@
+import pygame
+import UI
+
+class Node:
+    """
+    Layout tree node. Measured sizes and arranged rects are cached,
+    invalidate() clears them only for this node and its ancestors.
+    anchor and offset place the node inside the slot its parent gives it, fill makes it take the whole slot.
+    """
+    fill = True
+
+    def __init__(self, *children, anchor: str = 'center', margin: int | tuple[int, int] = 0, grow: float = 0,
+                 offset: UI.Coordinate = (0, 0), minSize: UI.size = (0, 0), **kwargs) -> None:
+        self.anchor = anchor
+        self.margin = (margin, margin) if isinstance(margin, int) else tuple(margin)
+        self.grow = grow
+        self.offset = offset
+        self.minSize = minSize
+        self.fill = kwargs.get('fill', self.fill)
+        self.parent = None
+        self.children = []
+        self.measured = None
+        self.rect = None
+        self.needsArrange = True
+        for child in children:
+            self.add(child)
+
+    def add(self, child) -> 'Node':
+        """ Append widget or node as a child, return its node """
+        child = wrap(child)
+        child.parent = self
+        self.children.append(child)
+        self.invalidate()
+        return child
+
+    def remove(self, child) -> None:
+        node = next(node for node in self.children if node is child or getattr(node, 'widget', None) is child)
+        self.children.remove(node)
+        node.parent = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Mark node and its ancestors for measuring and arranging again, leaving siblings cached
+        """
+        node = self
+        while node is not None and not (node.measured is None and node.needsArrange):
+            node.measured = None
+            node.needsArrange = True
+            node = node.parent
+
+    def measure(self) -> UI.size:
+        """ Return cached size including margins, measuring content only after invalidation """
+        if self.measured is None:
+            width, height = self.measureContent()
+            self.measured = (max(width, self.minSize[0]) + 2*self.margin[0], max(height, self.minSize[1]) + 2*self.margin[1])
+        return self.measured
+
+    def measureContent(self) -> UI.size:
+        return (0, 0)
+
+    def arrange(self, rect: pygame.Rect, moved: list) -> None:
+        """
+        Lay node out in rect, skipping the whole subtree if rect and content are unchanged
+        and only shifting it if just the position changed. Widgets that moved are appended to moved.
+        """
+        rect = pygame.Rect(rect)
+        if not self.needsArrange and self.rect is not None and rect.size == self.rect.size:
+            if rect.topleft != self.rect.topleft:
+                self.translate(rect.x - self.rect.x, rect.y - self.rect.y, moved)
+            return
+        self.rect = rect
+        self.needsArrange = False
+        self.arrangeContent(rect.inflate(-2*self.margin[0], -2*self.margin[1]), moved)
+
+    def arrangeContent(self, rect: pygame.Rect, moved: list) -> None:
+        pass
+
+    def translate(self, dx: int, dy: int, moved: list) -> None:
+        """ Shift an already arranged subtree without laying it out again """
+        self.rect.move_ip(dx, dy)
+        for child in self.children:
+            child.translate(dx, dy, moved)
+
+    def place(self, child: 'Node', slot: pygame.Rect, moved: list) -> None:
+        """ Arrange child in slot, filling it or sitting at the child's anchor """
+        if child.fill:
+            rect = pygame.Rect(slot)
+        else:
+            rect = pygame.Rect((0, 0), child.measure())
+            setattr(rect, child.anchor, getattr(slot, child.anchor))
+        child.arrange(rect.move(child.offset), moved)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def walkUp(self):
+        node = self
+        while node is not None:
+            yield node
+            node = node.parent
+
+
+class WidgetNode(Node):
+    """ Leaf holding a widget, measured from its current rect so nothing is rendered """
+    fill = False
+
+    def __init__(self, widget: pygame.sprite.Sprite, **kwargs) -> None:
+        self.widget = widget
+        super().__init__(**kwargs)
+
+    def measureContent(self) -> UI.size:
+        return self.widget.rect.size
+
+    def arrangeContent(self, rect: pygame.Rect, moved: list) -> None:
+        if UI.moveWidget(self.widget, rect.topleft):
+            moved.append(self.widget)
+
+    def translate(self, dx: int, dy: int, moved: list) -> None:
+        self.rect.move_ip(dx, dy)
+        if UI.moveWidget(self.widget, (self.widget.rect.x + dx, self.widget.rect.y + dy)):
+            moved.append(self.widget)
+
+
+def wrap(child) -> Node:
+    """ Return child as a layout node, wrapping widgets in a WidgetNode """
+    return child if isinstance(child, Node) else WidgetNode(child)
+
+
+class Box(Node):
+    """
+    Lay children out along one axis with spacing. Space left over goes to children with grow,
+    or shifts all children by justify ('start', 'center', 'end') when none grow.
+    """
+    axis = 0
+
+    def __init__(self, *children, spacing: int = 0, justify: str = 'start', **kwargs) -> None:
+        self.spacing = spacing
+        self.justify = justify
+        super().__init__(*children, **kwargs)
+
+    def measureContent(self) -> UI.size:
+        sizes = [child.measure() for child in self.children]
+        main = sum(size[self.axis] for size in sizes) + self.spacing * max(0, len(sizes) - 1)
+        cross = max((size[1 - self.axis] for size in sizes), default=0)
+        return (main, cross) if self.axis == 0 else (cross, main)
+
+    def arrangeContent(self, rect: pygame.Rect, moved: list) -> None:
+        mainLength = rect.size[self.axis]
+        contentLength = self.measureContent()[self.axis]
+        extra = max(0, mainLength - contentLength)
+        growTotal = sum(child.grow for child in self.children)
+
+        position = 0
+        if not growTotal:
+            position = {'start': 0, 'center': extra // 2, 'end': extra}[self.justify]
+
+        for child in self.children:
+            length = child.measure()[self.axis]
+            if growTotal and child.grow:
+                length += round(extra * child.grow / growTotal)
+            if self.axis == 0:
+                slot = pygame.Rect(rect.x + position, rect.y, length, rect.height)
+            else:
+                slot = pygame.Rect(rect.x, rect.y + position, rect.width, length)
+            self.place(child, slot, moved)
+            position += length + self.spacing
+
+
+class Row(Box):
+    axis = 0
+
+class Column(Box):
+    axis = 1
+
+
+class Grid(Node):
+    """
+    Lay children out row by row in a fixed number of columns sized to their widest and tallest cells.
+    With expand, space left over is shared evenly between columns and rows.
+    """
+    def __init__(self, *children, columns: int = 2, spacing: int = 0, expand: bool = True, **kwargs) -> None:
+        self.columns = columns
+        self.spacing = spacing
+        self.expand = expand
+        super().__init__(*children, **kwargs)
+
+    def tracks(self) -> tuple[list[int], list[int]]:
+        """ Return column widths and row heights from the children's measured sizes """
+        widths = [0] * min(self.columns, len(self.children))
+        heights = [0] * -(-len(self.children) // self.columns)
+        for index, child in enumerate(self.children):
+            width, height = child.measure()
+            row, column = divmod(index, self.columns)
+            widths[column] = max(widths[column], width)
+            heights[row] = max(heights[row], height)
+        return widths, heights
+
+    def measureContent(self) -> UI.size:
+        widths, heights = self.tracks()
+        return (sum(widths) + self.spacing * max(0, len(widths) - 1), sum(heights) + self.spacing * max(0, len(heights) - 1))
+
+    def arrangeContent(self, rect: pygame.Rect, moved: list) -> None:
+        widths, heights = self.tracks()
+        if self.expand and widths:
+            width, height = self.measureContent()
+            widths = [track + max(0, rect.width - width) // len(widths) for track in widths]
+            heights = [track + max(0, rect.height - height) // len(heights) for track in heights]
+        lefts = [rect.x + sum(widths[:column]) + self.spacing * column for column in range(len(widths))]
+        tops = [rect.y + sum(heights[:row]) + self.spacing * row for row in range(len(heights))]
+        for index, child in enumerate(self.children):
+            row, column = divmod(index, self.columns)
+            self.place(child, pygame.Rect(lefts[column], tops[row], widths[column], heights[row]), moved)
+
+
+class Anchor(Node):
+    """ Place every child at its own anchor and offset inside the full rect, e.g. HUD corners """
+    def measureContent(self) -> UI.size:
+        sizes = [child.measure() for child in self.children]
+        return (max((size[0] for size in sizes), default=0), max((size[1] for size in sizes), default=0))
+
+    def arrangeContent(self, rect: pygame.Rect, moved: list) -> None:
+        for child in self.children:
+            self.place(child, rect, moved)
+
+
+class Layout:
+    """
+    Root of a layout tree bound to a screen area. layout() re-arranges only what changed and
+    reindexes moved widgets in the UIManager, widgets are moved and never re-rendered.
+    """
+    def __init__(self, root: Node, rect: pygame.Rect = None, manager: UI.UIManager = None) -> None:
+        self.root = wrap(root)
+        self.rect = pygame.Rect(rect) if rect is not None else None
+        self.manager = manager
+        self.nodes = {}
+
+    def nodeFor(self, widget: pygame.sprite.Sprite) -> WidgetNode:
+        """ Return leaf holding widget, rebuilding the lookup if the tree changed """
+        node = self.nodes.get(widget)
+        if node is None or self.root not in node.walkUp():
+            self.nodes = {node.widget: node for node in self.root.walk() if isinstance(node, WidgetNode)}
+            node = self.nodes[widget]
+        return node
+
+    def invalidate(self, widget: pygame.sprite.Sprite) -> None:
+        """ Mark widget as changed in size so only its ancestors are measured again """
+        self.nodeFor(widget).invalidate()
+
+    def resize(self, size: UI.size) -> list[pygame.sprite.Sprite]:
+        return self.layout(pygame.Rect((0, 0), size))
+
+    def layout(self, rect: pygame.Rect = None) -> list[pygame.sprite.Sprite]:
+        """
+        Measure and arrange tree in rect (the last rect by default), return widgets that moved
+        """
+        if rect is not None:
+            self.rect = pygame.Rect(rect)
+        moved = []
+        self.root.measure()
+        self.root.arrange(self.rect, moved)
+        if self.manager is not None:
+            for widget in moved:
+                self.manager.reindex(widget)
+        return moved
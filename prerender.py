@@ -0,0 +1,245 @@
+import pygame
+import hashlib
+import importlib
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+# file layout: header, then per surface (width, height, alpha) followed by width*height*4 RGBA bytes
+MAGIC = b'PGTK'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH')
+ENTRY = struct.Struct('<IIB')
+SUFFIX = '.px'
+
+class PrerenderCache:
+    """
+    Optional on-disk cache of prerendered widget surfaces stored as raw RGBA buffers.
+    Disabled until open() is given a directory, so widgets pay nothing by default.
+    Entries are keyed by a hash of the widget configuration, its font files and the pygame/SDL version,
+    read back through memory-mapped files and evicted least recently used past maxBytes.
+    """
+    def __init__(self, directory: str = None, maxBytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = None
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.fontFiles = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        if directory is not None:
+            self.open(directory, maxBytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def open(self, directory: str, maxBytes: int = None) -> None:
+        """
+        Enable cache in directory, indexing existing entries from oldest to most recently used
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        if maxBytes is not None:
+            self.maxBytes = maxBytes
+        found = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-len(SUFFIX)], stat.st_size))
+        self.entries.clear()
+        self.bytes = 0
+        for _, key, entryBytes in sorted(found):
+            self.entries[key] = entryBytes
+            self.bytes += entryBytes
+        self.evict()
+
+    def close(self) -> None:
+        self.directory = None
+        self.entries.clear()
+        self.bytes = 0
+
+    def fontSignature(self, fontKey: tuple) -> tuple:
+        """
+        Return (path, size, mtime) of the font file SysFont would pick for fontKey
+        """
+        signature = self.fontFiles.get(fontKey)
+        if signature is None:
+            fontName, _, bold, italic = fontKey
+            path = pygame.font.match_font(fontName, bold, italic) or pygame.font.get_default_font()
+            try:
+                stat = os.stat(path)
+                signature = (path, stat.st_size, int(stat.st_mtime))
+            except OSError:
+                signature = (path, 0, 0)
+            self.fontFiles[fontKey] = signature
+        return signature
+
+    def keyFor(self, kind: str, config: dict, fontKeys: list[tuple]) -> str:
+        """
+        Return cache key for a widget kind and configuration, or None while the cache is disabled
+        """
+        if self.directory is None:
+            return None
+        parts = (FORMAT_VERSION, kind, sorted((name, repr(value)) for name, value in config.items()),
+                 [self.fontSignature(fontKey) for fontKey in fontKeys], pygame.version.ver, pygame.get_sdl_version())
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key: str) -> list[pygame.Surface]:
+        """
+        Return cached surfaces for key, or None on a miss
+        """
+        if key is None or key not in self.entries:
+            if key is not None:
+                self.misses += 1
+            return None
+        try:
+            surfaces = self.read(self.path(key))
+        except (OSError, ValueError, struct.error, pygame.error):
+            self.discard(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+        return surfaces
+
+    def read(self, path: str) -> list[pygame.Surface]:
+        """ Map entry file and copy its buffers into display format surfaces """
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                magic, version, count = HEADER.unpack_from(mapped, 0)
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    raise ValueError('stale prerender entry')
+                offset = HEADER.size
+                surfaces = []
+                for _ in range(count):
+                    width, height, alpha = ENTRY.unpack_from(mapped, offset)
+                    offset += ENTRY.size
+                    length = width * height * 4
+                    buffer = view[offset:offset + length]
+                    mappedSurface = pygame.image.frombuffer(buffer, (width, height), 'RGBA')
+                    surfaces.append(self.toSurface(mappedSurface, alpha))
+                    del mappedSurface
+                    buffer.release()
+                    offset += length
+                return surfaces
+            finally:
+                view.release()
+
+    @staticmethod
+    def toSurface(mapped: pygame.Surface, alpha: bool) -> pygame.Surface:
+        """ Return independent copy of a surface that still points into the mapped file """
+        if pygame.display.get_surface() is not None:
+            return mapped.convert_alpha() if alpha else mapped.convert()
+        surface = pygame.Surface(mapped.get_size(), pygame.SRCALPHA if alpha else 0)
+        surface.blit(mapped, (0, 0), special_flags = pygame.BLEND_RGBA_ADD if alpha else 0)
+        return surface
+
+    def store(self, key: str, surfaces: list[pygame.Surface]) -> None:
+        """
+        Write surfaces for key, evicting least recently used entries past maxBytes
+        """
+        if key is None:
+            return
+        chunks = [HEADER.pack(MAGIC, FORMAT_VERSION, len(surfaces))]
+        for surface in surfaces:
+            width, height = surface.get_size()
+            chunks.append(ENTRY.pack(width, height, bool(surface.get_flags() & pygame.SRCALPHA)))
+            chunks.append(pygame.image.tobytes(surface, 'RGBA'))
+        data = b''.join(chunks)
+        if len(data) > self.maxBytes:
+            return
+
+        path = self.path(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            return
+
+        self.bytes += len(data) - self.entries.pop(key, 0)
+        self.entries[key] = len(data)
+        self.stores += 1
+        self.evict()
+
+    def discard(self, key: str) -> None:
+        self.bytes -= self.entries.pop(key, 0)
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until cache fits in maxBytes
+        """
+        while self.bytes > self.maxBytes and self.entries:
+            self.discard(next(iter(self.entries)))
+            self.evictions += 1
+
+    def setBudget(self, maxBytes: int) -> None:
+        self.maxBytes = maxBytes
+        self.evict()
+
+    def clear(self) -> None:
+        """ Delete every entry from disk """
+        for key in list(self.entries):
+            self.discard(key)
+        self.resetStats()
+
+    def resetStats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'maxBytes': self.maxBytes,
+                'hits': self.hits, 'misses': self.misses, 'stores': self.stores, 'evictions': self.evictions}
+
+    def prebuild(self, screens: list) -> dict:
+        """
+        Populate cache by calling each screen builder once, e.g. from a build step before shipping
+        """
+        if pygame.display.get_surface() is None:
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        for build in screens:
+            build()
+        return self.stats()
+
+cache = PrerenderCache()
+
+
+def resolve(target: str):
+    """ Return callable named by 'module:function' """
+    moduleName, _, name = target.partition(':')
+    return getattr(importlib.import_module(moduleName), name or 'main')
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Prebuild the prerendered widget cache for a list of screens')
+    parser.add_argument('directory', help='cache directory')
+    parser.add_argument('screens', nargs='+', help="screen builders as 'module:function', called with no arguments")
+    parser.add_argument('--max-bytes', type=int, default=64 * 1024 * 1024)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.getcwd())
+    pygame.init()
+    cache.open(args.directory, args.max_bytes)
+    print(cache.prebuild([resolve(target) for target in args.screens]))
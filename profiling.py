@@ -0,0 +1,272 @@
+import pygame
+import threading
+import time
+import weakref
+from collections import deque
+from functools import wraps
+
+import Color
+import UI
+import transitions
+
+# methods timed per class: the first is the update entry point (setText for Label, which has no update),
+# the rest render into the widget image
+INSTRUMENTED = {
+    UI.Label: ['setText', 'renderImage'],
+    UI.InputField: ['update', 'renderInput'],
+    UI.Slider: ['update', 'composite'],
+    UI.Table: ['update', 'renderViewport'],
+    UI.ColumnTable: ['update', 'renderRows', 'renderHeader'],
+    UI.Switch: ['update', 'moveKnob'],
+    UI.Button: ['update'],
+    transitions.Transition: ['update', 'set_progress'],
+}
+
+class WidgetStats:
+    """ Accumulated cost of one widget """
+    __slots__ = ('updateTime', 'renderTime', 'allocations', 'textRenders', 'calls')
+
+    def __init__(self) -> None:
+        self.updateTime = 0.0
+        self.renderTime = 0.0
+        self.allocations = 0
+        self.textRenders = 0
+        self.calls = 0
+
+    def add(self, other: 'WidgetStats') -> None:
+        self.updateTime += other.updateTime
+        self.renderTime += other.renderTime
+        self.allocations += other.allocations
+        self.textRenders += other.textRenders
+        self.calls += other.calls
+
+    def asDict(self) -> dict:
+        return {'updateMs': self.updateTime * 1e3, 'renderMs': self.renderTime * 1e3, 'allocations': self.allocations,
+                'textRenders': self.textRenders, 'calls': self.calls}
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of widget and transition methods.
+    enable() wraps the methods in INSTRUMENTED and disable() restores the originals,
+    so a disabled profiler adds no cost at all. Call endFrame() once per frame after update and draw (App does it).
+    """
+    def __init__(self, history: int = 120) -> None:
+        self.enabled = False
+        self.originals = {}
+        self.frameTimes = deque(maxlen=history)
+        self.frameStats = {}
+        self.lastFrameStats = {}
+        self.totals = weakref.WeakKeyDictionary()
+        self.lastFrameEnd = None
+        self.depth = 0
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        for cls, methods in INSTRUMENTED.items():
+            for index, name in enumerate(methods):
+                self.originals[(cls, name)] = cls.__dict__.get(name)
+                setattr(cls, name, self.wrap(getattr(cls, name), isUpdate = index == 0))
+        self.enabled = True
+        self.lastFrameEnd = time.perf_counter()
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        for (cls, name), original in self.originals.items():
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self.originals.clear()
+        self.enabled = False
+
+    def wrap(self, method, isUpdate: bool):
+        profiler = self
+        mainThread = threading.main_thread().ident
+
+        @wraps(method)
+        def instrumented(widget, *args, **kwargs):
+            # render workers call renderImage too, their time is not spent in the frame
+            if threading.get_ident() != mainThread:
+                return method(widget, *args, **kwargs)
+            # only the outermost instrumented call counts allocations, so render inside update is not counted twice
+            outermost = profiler.depth == 0
+            profiler.depth += 1
+            allocations, textRenders = UI.surfaceAllocations, UI.textRenders
+            start = time.perf_counter()
+            try:
+                return method(widget, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                profiler.depth -= 1
+                stats = profiler.frameStats.get(widget)
+                if stats is None:
+                    stats = profiler.frameStats[widget] = WidgetStats()
+                if isUpdate:
+                    stats.updateTime += elapsed
+                    stats.calls += 1
+                else:
+                    stats.renderTime += elapsed
+                if outermost:
+                    stats.allocations += UI.surfaceAllocations - allocations
+                    stats.textRenders += UI.textRenders - textRenders
+        return instrumented
+
+    def endFrame(self) -> None:
+        """
+        Close current frame: record frame time and fold per-widget frame stats into totals
+        """
+        now = time.perf_counter()
+        if self.lastFrameEnd is not None:
+            self.frameTimes.append(now - self.lastFrameEnd)
+        self.lastFrameEnd = now
+
+        for widget, stats in self.frameStats.items():
+            total = self.totals.get(widget)
+            if total is None:
+                total = self.totals[widget] = WidgetStats()
+            total.add(stats)
+        self.lastFrameStats = self.frameStats
+        self.frameStats = {}
+
+    def reset(self) -> None:
+        self.frameTimes.clear()
+        self.frameStats = {}
+        self.lastFrameStats = {}
+        self.totals = weakref.WeakKeyDictionary()
+
+    def topWidgets(self, count: int = 5, frame: bool = False) -> list[tuple[object, WidgetStats]]:
+        """
+        Return most expensive widgets by update plus render time, from the last frame or since reset
+        """
+        source = self.lastFrameStats if frame else self.totals
+        ranked = sorted(source.items(), key=lambda item: item[1].updateTime + item[1].renderTime, reverse=True)
+        return ranked[:count]
+
+    def averageFrameMs(self) -> float:
+        return sum(self.frameTimes) / len(self.frameTimes) * 1e3 if self.frameTimes else 0.0
+
+    def stats(self, count: int = 5) -> dict:
+        """ Return snapshot of frame times, top widgets and cache statistics """
+        return {
+            'frameMs': self.averageFrameMs(),
+            'maxFrameMs': max(self.frameTimes, default=0) * 1e3,
+            'lastFrame': {describe(widget): stats.asDict() for widget, stats in self.lastFrameStats.items()},
+            'topWidgets': [(describe(widget), stats.asDict()) for widget, stats in self.topWidgets(count)],
+            'fonts': UI.fontRegistry.stats(),
+            'text': UI.textCache.stats(),
+            'pool': UI.surfacePool.stats(),
+            'surfaceAllocations': UI.surfaceAllocations,
+            'textRenders': UI.textRenders,
+        }
+
+
+def describe(widget) -> str:
+    """ Return short label for a widget in stats output """
+    rect = getattr(widget, 'rect', None)
+    where = f'@{rect.x},{rect.y}' if rect is not None else f'#{id(widget):x}'
+    return type(widget).__name__ + where
+
+def hitRate(stats: dict) -> float:
+    lookups = stats['hits'] + stats['misses']
+    return stats['hits'] / lookups if lookups else 1.0
+
+profiler = Profiler()
+
+
+def blitPath(surface: pygame.Surface) -> tuple[str, str]:
+    """
+    Return (format, problem) of blitting surface to the display, problem is None on the fast path.
+    Checks for surfaces not converted to the display format, per-pixel alpha the pixels do not need
+    and colorkey surfaces without RLE acceleration.
+    """
+    flags = surface.get_flags()
+    display = pygame.display.get_surface()
+    if flags & pygame.SRCALPHA:
+        if display is not None and surface.get_masks() != alphaMasks():
+            return UI.ALPHA, 'not in display alpha format'
+        needed = UI.imageFormat(surface)
+        return UI.ALPHA, None if needed == UI.ALPHA else f'per-pixel alpha on {needed} pixels'
+    kind = UI.COLORKEY if surface.get_colorkey() is not None else UI.OPAQUE
+    if display is not None and (surface.get_bitsize() != display.get_bitsize() or surface.get_masks()[:3] != display.get_masks()[:3]):
+        return kind, 'not in display format'
+    if kind == UI.COLORKEY and not flags & (pygame.RLEACCEL | pygame.RLEACCELOK):
+        return kind, 'colorkey without RLE'
+    return kind, None
+
+def alphaMasks() -> tuple:
+    """ Return channel masks convert_alpha gives on the current display """
+    return pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+
+def blitReport(sprites) -> list[dict]:
+    """ Return blit format and slow path problem of every sprite image, e.g. blitReport(manager) """
+    report = []
+    for sprite in sprites:
+        if getattr(sprite, 'image', None) is None:
+            continue
+        kind, problem = blitPath(sprite.image)
+        report.append({'widget': describe(sprite), 'format': kind, 'problem': problem})
+    return report
+
+def slowBlits(sprites) -> list[tuple[object, str]]:
+    """ Return (sprite, problem) for sprites whose image takes a slow blit path """
+    slow = []
+    for sprite in sprites:
+        if getattr(sprite, 'image', None) is None:
+            continue
+        problem = blitPath(sprite.image)[1]
+        if problem is not None:
+            slow.append((sprite, problem))
+    return slow
+
+
+class PerformanceOverlay(pygame.sprite.Sprite):
+    """
+    Drop-in sprite showing frame time, most expensive widgets and cache hit rates of the frames closed so far.
+    App ends profiler frames after rendering, without App call profiler.endFrame() after each frame is drawn.
+    """
+    def __init__(self, dest: UI.Coordinate = (0, 0), **kwargs) -> None:
+        super().__init__()
+        defaults = {
+            'profiler' : profiler,
+            'topCount' : 5,
+            'textSize' : 12,
+            'fontName' : 'Arial',
+            'textColor' : Color.LIME,
+            'backgroundColor' : (0, 0, 0, 180),
+            'refreshInterval' : 0.25,
+            'width' : 300,
+        }
+
+        for attr, default in defaults.items():
+            setattr(self, attr, kwargs.get(attr, default))
+
+        self.profiler.enable()
+        self.font = UI.getFont(self.fontName, self.textSize)
+        self.lineHeight = self.font.get_linesize()
+        self.image = pygame.Surface((self.width, self.lineHeight * (self.topCount + 4) + 4), pygame.SRCALPHA).convert_alpha()
+        self.rect = self.image.get_rect(topleft = dest)
+        self.lastRefresh = 0
+        self.dirty = True
+
+    def update(self, *args, **kwargs) -> None:
+        now = time.perf_counter()
+        if now - self.lastRefresh >= self.refreshInterval:
+            self.lastRefresh = now
+            self.render()
+
+    def render(self) -> None:
+        frameMs = self.profiler.averageFrameMs()
+        lines = [f'frame {frameMs:6.2f} ms  ({1000 / frameMs if frameMs else 0:5.1f} fps)  max {max(self.profiler.frameTimes, default=0) * 1e3:6.2f} ms']
+        for widget, stats in self.profiler.topWidgets(self.topCount):
+            calls = max(stats.calls, 1)
+            lines.append(f'{describe(widget):<24} {(stats.updateTime + stats.renderTime) / calls * 1e6:8.1f} us/call  alloc {stats.allocations}')
+        lines.append(f'font hits {hitRate(UI.fontRegistry.stats()):6.1%}   text hits {hitRate(UI.textCache.stats()):6.1%}')
+        lines.append(f'surfaces {UI.surfaceAllocations}   text renders {UI.textRenders}')
+
+        self.image.fill(self.backgroundColor)
+        for index, line in enumerate(lines):
+            self.image.blit(self.font.render(line, True, self.textColor), (4, 2 + index * self.lineHeight))
+        self.dirty = True
@@ -2,6 +2,7 @@ from os import environ
 import pygame
 import UI
 import Color
+from app import App
 
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
@@ -13,11 +14,9 @@ pygame.display.set_caption('PyGame Tester')
 
 UI.screenColor = Color.BLACK
 
-clock = pygame.time.Clock()
 pygame.key.set_repeat(750, 50)
 
 def test_screen():
-    run = True
     screen_center = screen.get_rect().center
     textList = ['Testing String', 'I', 'HOPE', 'this', 'WoRkS']
 
@@ -27,7 +26,7 @@ def test_screen():
                       bold=True, italic=True, placeHolderText='Name Here', inputBackgroundColor=Color.DIMGRAY, 
                       inputBackgroundRounded=5, inputMargin=[25,10], inputWidth=[250,30], inputBackgroundWidth=2, labelAlign='left'),
     # label2 = UI.Label(screen_center, '-10000', Color.WHITE, 16)
-    group = pygame.sprite.Group(
+    group = UI.UIManager(
         # input,
         # UI.Table([screen_center[0], screen_center[1]+75], textList, Color.WHITE, 32, 'Arial', bold=True),
         UI.Slider(screen_center, [300, 5], 7.5, [-100, 100]),
@@ -37,20 +36,8 @@ def test_screen():
         # UI.Switch(screen_center, 100, 50)
     )
 
-    while run:
-        clock.tick(60)
-        event_list = pygame.event.get()
-        for event in event_list:
-            if event.type == pygame.QUIT:
-                run = False
-                pygame.quit()
-                exit(0)
-        
-        group.update(event_list)
-
-        screen.fill(UI.screenColor)
-        group.draw(screen)
-        pygame.display.flip()
+    # renders at 60 fps only while something changes, otherwise sleeps until input arrives
+    App(screen, group, fps=60).run()
 
     return 
 
@@ -0,0 +1,112 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class RenderPool:
+    """
+    Worker threads for off-main-thread rasterization. Jobs run on a worker in priority order
+    (lowest first), their results are applied on the main thread by pump(), which the
+    UIManager calls every frame. Each submit returns a Future resolved once the result is applied.
+    """
+    def __init__(self, workers: int = 2) -> None:
+        self.workers = workers
+        self.tasks = queue.PriorityQueue()
+        self.done = queue.SimpleQueue()
+        self.order = itertools.count()
+        self.threads = []
+        self.pending = 0
+
+    def start(self) -> None:
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self.work, name=f'RenderPool-{len(self.threads)}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, job, apply, priority: float = 0) -> Future:
+        """
+        Queue job to run on a worker, apply(result) runs on the main thread during pump()
+        """
+        future = Future()
+        self.pending += 1
+        self.tasks.put((priority, next(self.order), job, apply, future))
+        self.start()
+        return future
+
+    def work(self) -> None:
+        while True:
+            _, _, job, apply, future = self.tasks.get()
+            if job is None:
+                return
+            try:
+                self.done.put((apply, job(), None, future))
+            except Exception as error:
+                self.done.put((apply, None, error, future))
+
+    def pump(self, budget: float = None) -> int:
+        """
+        Apply finished jobs on the calling (main) thread, stopping after budget seconds if given.
+        Return number of jobs applied
+        """
+        applied = 0
+        deadline = time.perf_counter() + budget if budget is not None else None
+        while self.pending:
+            try:
+                apply, result, error, future = self.done.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            applied += 1
+            if error is None:
+                try:
+                    future.set_result(apply(result))
+                except Exception as applyError:
+                    future.set_exception(applyError)
+            else:
+                future.set_exception(error)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return applied
+
+    def wait(self, futures: list[Future], timeout: float = None) -> bool:
+        """
+        Block the main thread, applying results, until futures are done, return false on timeout
+        """
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        while not all(future.done() for future in futures):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            if not self.pump():
+                time.sleep(0.001)
+        return True
+
+    def shutdown(self) -> None:
+        """ Stop workers after the jobs already queued """
+        for _ in self.threads:
+            self.tasks.put((float('inf'), next(self.order), None, None, None))
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+pool = RenderPool()
+
+
+def whenAll(futures: list[Future]) -> Future:
+    """ Return future resolved when every future is done, e.g. to start a transition once a screen is ready """
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def finished(_) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            combined.set_result([future.result() if not future.exception() else None for future in futures])
+
+    if not futures:
+        combined.set_result([])
+    for future in futures:
+        future.add_done_callback(finished)
+    return combined
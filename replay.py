@@ -0,0 +1,211 @@
+import pygame
+import importlib
+import marshal
+import os
+import struct
+import sys
+import time
+import zlib
+
+import UI
+
+# file layout: header, then a zlib stream of frames (dt, mouse position, event count) each followed by its events
+MAGIC = b'PGRC'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHII')
+FRAME = struct.Struct('<diiH')
+EVENT = struct.Struct('<IH')
+MOTION = struct.Struct('<iiiiB')
+BUTTON = struct.Struct('<iiB')
+WHEEL = struct.Struct('<iiff?')
+KEY = struct.Struct('<iHI')
+
+def storable(value) -> bool:
+    """ Return true for event attribute values marshal can write, numbers and strings or tuples of them """
+    if isinstance(value, tuple):
+        return all(isinstance(item, (bool, int, float, str)) for item in value)
+    return isinstance(value, (bool, int, float, str))
+
+def encodeEvent(event: pygame.event.Event) -> bytes:
+    """ Pack event as type, payload length and a payload laid out per event type """
+    if event.type == pygame.MOUSEMOTION:
+        buttons = sum(1 << index for index, pressed in enumerate(event.buttons) if pressed)
+        payload = MOTION.pack(*event.pos, *event.rel, buttons)
+    elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        payload = BUTTON.pack(*event.pos, event.button)
+    elif event.type == pygame.MOUSEWHEEL:
+        payload = WHEEL.pack(event.x, event.y, getattr(event, 'precise_x', event.x), getattr(event, 'precise_y', event.y), getattr(event, 'flipped', False))
+    elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
+        payload = KEY.pack(event.key, getattr(event, 'mod', 0), getattr(event, 'scancode', 0)) + getattr(event, 'unicode', '').encode()
+    elif event.type == pygame.TEXTINPUT:
+        payload = event.text.encode()
+    else:
+        # other events keep the attributes marshal can store, window handles and objects are dropped
+        payload = marshal.dumps({name: value for name, value in event.dict.items() if storable(value)})
+    return EVENT.pack(event.type, len(payload)) + payload
+
+def decodeEvent(eventType: int, payload: bytes) -> pygame.event.Event:
+    if eventType == pygame.MOUSEMOTION:
+        x, y, dx, dy, buttons = MOTION.unpack(payload)
+        return pygame.event.Event(eventType, pos=(x, y), rel=(dx, dy), buttons=tuple(bool(buttons >> index & 1) for index in range(3)), touch=False)
+    if eventType in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        x, y, button = BUTTON.unpack(payload)
+        return pygame.event.Event(eventType, pos=(x, y), button=button, touch=False)
+    if eventType == pygame.MOUSEWHEEL:
+        x, y, preciseX, preciseY, flipped = WHEEL.unpack(payload)
+        return pygame.event.Event(eventType, x=x, y=y, precise_x=preciseX, precise_y=preciseY, flipped=flipped, touch=False)
+    if eventType in (pygame.KEYDOWN, pygame.KEYUP):
+        key, mod, scancode = KEY.unpack_from(payload)
+        return pygame.event.Event(eventType, key=key, mod=mod, scancode=scancode, unicode=payload[KEY.size:].decode())
+    if eventType == pygame.TEXTINPUT:
+        return pygame.event.Event(eventType, text=payload.decode())
+    return pygame.event.Event(eventType, marshal.loads(payload))
+
+
+class Recorder:
+    """
+    Log every frame's events, pointer position and dt to a compact zlib compressed file.
+    Pass it to App(recorder=...) or call record() once per frame with what the UIManager was updated with.
+    """
+    def __init__(self, path: str, size: UI.size = None) -> None:
+        display = pygame.display.get_surface()
+        size = size or (display.get_size() if display is not None else (0, 0))
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, *size))
+        self.compressor = zlib.compressobj(6)
+        self.frames = 0
+        self.events = 0
+
+    def record(self, events: list[pygame.event.Event], dt: float, mousePos: UI.Coordinate = None) -> None:
+        """ Append one frame, mousePos defaults to where widgets read the pointer """
+        x, y = UI.getMousePos(mousePos)
+        chunks = [FRAME.pack(dt or 0.0, int(x), int(y), len(events))]
+        chunks.extend(encodeEvent(event) for event in events)
+        self.file.write(self.compressor.compress(b''.join(chunks)))
+        self.frames += 1
+        self.events += len(events)
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.file.write(self.compressor.flush())
+        self.file.close()
+
+    def __enter__(self) -> 'Recorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> dict:
+        return {'frames': self.frames, 'events': self.events, 'bytes': self.file.tell() if not self.file.closed else os.path.getsize(self.path)}
+
+
+class Replayer:
+    """
+    Feed a recorded session back through an App frame by frame. While replaying, widgets that read the pointer
+    get the recorded position from UI.mouseSource. Replays run as fast as possible unless realtime is set,
+    and record how long every frame took so outliers can be traced back to the moment in the session.
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            magic, version, width, height = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{path} is not a version {FORMAT_VERSION} recording')
+            self.data = zlib.decompress(file.read())
+        self.size = (width, height)
+        self.frameTimes = []
+        self.sessionTimes = []
+        self.sessionSeconds = 0.0
+        self.wallTime = 0.0
+
+    def frames(self):
+        """ Yield (dt, mousePos, events) for every recorded frame """
+        data, offset = self.data, 0
+        while offset < len(data):
+            dt, x, y, count = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+            events = []
+            for _ in range(count):
+                eventType, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                events.append(decodeEvent(eventType, data[offset:offset + length]))
+                offset += length
+            yield dt, (x, y), events
+
+    def run(self, app, realtime: bool = False) -> dict:
+        """
+        Replay every frame into app, return stats(). Stops early at a recorded QUIT like App.run
+        """
+        self.frameTimes = []
+        self.sessionTimes = []
+        self.sessionSeconds = 0.0
+        mousePos = [(0, 0)]
+        previousSource = UI.mouseSource
+        UI.mouseSource = lambda: mousePos[0]
+        start = time.perf_counter()
+        try:
+            pygame.display.update(app.manager.repaint(app.screen))
+            for dt, mousePos[0], events in self.frames():
+                frameStart = time.perf_counter()
+                running = app.advance(events, dt)
+                elapsed = time.perf_counter() - frameStart
+                self.frameTimes.append(elapsed)
+                self.sessionTimes.append(self.sessionSeconds)
+                self.sessionSeconds += dt
+                if not running:
+                    break
+                if realtime and dt > elapsed:
+                    time.sleep(dt - elapsed)
+        finally:
+            UI.mouseSource = previousSource
+        self.wallTime = time.perf_counter() - start
+        return self.stats()
+
+    def outliers(self, count: int = 10) -> list[tuple[int, float, float]]:
+        """ Return (frame index, session seconds, frame ms) of the slowest frames, slowest first """
+        slowest = sorted(range(len(self.frameTimes)), key=self.frameTimes.__getitem__, reverse=True)[:count]
+        return [(index, self.sessionTimes[index], self.frameTimes[index] * 1e3) for index in slowest]
+
+    def stats(self, count: int = 10) -> dict:
+        frameTimes = sorted(self.frameTimes)
+        return {
+            'frames': len(frameTimes),
+            'sessionSeconds': self.sessionSeconds,
+            'wallSeconds': self.wallTime,
+            'meanMs': sum(frameTimes) / len(frameTimes) * 1e3 if frameTimes else 0.0,
+            'p99Ms': frameTimes[int(len(frameTimes) * 0.99)] * 1e3 if frameTimes else 0.0,
+            'maxMs': frameTimes[-1] * 1e3 if frameTimes else 0.0,
+            'outliers': self.outliers(count),
+        }
+
+
+def resolve(target: str):
+    """ Return callable named by 'module:function' """
+    moduleName, _, name = target.partition(':')
+    return getattr(importlib.import_module(moduleName), name or 'main')
+
+if __name__ == '__main__':
+    import argparse
+    from app import App
+
+    parser = argparse.ArgumentParser(description='Replay a recorded session headlessly and report frame-time outliers')
+    parser.add_argument('recording', help='file written by replay.Recorder')
+    parser.add_argument('screen', help="screen builder as 'module:function', called with the display surface, returning a UIManager or App")
+    parser.add_argument('--realtime', action='store_true', help='keep recorded frame timing instead of running as fast as possible')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest frames to list')
+    args = parser.parse_args()
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    sys.path.insert(0, os.getcwd())
+    pygame.init()
+    replayer = Replayer(args.recording)
+    screen = pygame.display.set_mode(replayer.size if all(replayer.size) else (1280, 720))
+    built = resolve(args.screen)(screen)
+    app = built if isinstance(built, App) else App(screen, built)
+    stats = replayer.run(app, realtime=args.realtime)
+    print(f"{stats['frames']} frames, {stats['sessionSeconds']:.1f} s session replayed in {stats['wallSeconds']:.2f} s")
+    print(f"frame mean {stats['meanMs']:.3f} ms  p99 {stats['p99Ms']:.3f} ms  max {stats['maxMs']:.3f} ms")
+    for index, sessionSeconds, frameMs in replayer.outliers(args.top):
+        print(f'  frame {index:>8} at {sessionSeconds:>9.2f} s  {frameMs:8.3f} ms')
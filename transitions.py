@@ -3,24 +3,74 @@ from os import environ
 
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
-class HorizontalRectangleSwipeTransition(pygame.sprite.Sprite):
-
-    def __init__(self):
+from animation import AnimationScheduler, EASINGS, get_easing, linear, ease_in_quad, ease_out_quad, ease_in_out_quad, \
+    ease_in_cubic, ease_out_cubic, ease_in_out_cubic
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Transition(pygame.sprite.Sprite):
+    """
+    Base class for full window transitions driven by elapsed time.
+    Progress is a tween on an AnimationScheduler, subclasses implement render(progress) with eased progress in [0, 1].
+    By default each transition steps a private scheduler from update(dt); pass a shared scheduler to have the
+    app loop step it alongside widget animations instead.
+    """
+
+    def __init__(self, duration, easing=linear, size=None, scheduler=None):
         pygame.sprite.Sprite.__init__(self)
 
-        self.width, self.height = pygame.display.get_window_size()
+        self.width, self.height = size or pygame.display.get_window_size()
+        self.duration = max(duration, 1e-6)
+        self.easing = get_easing(easing)
+        self.progress = 0
+        self.transitioning = True
+        self.dirty = True
 
-        self.image = pygame.Surface((self.width, self.height)).convert_alpha()
-        self.rect = self.image.get_rect()
-        self.rect.x = 0
-        self.rect.y = 0
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler or AnimationScheduler(capacity=1)
+        self.scheduler.add(self, 'set_progress', 0, 1, self.duration, self.easing, self.finish)
 
-        self.transitioning = True
-        self.speed = 300
+    def update(self, dt):
+        if self.transitioning and self.owns_scheduler:
+            self.scheduler.step(dt)
+
+    def set_progress(self, progress):
+        self.progress = progress
+        self.render(progress)
+
+    def render(self, progress):
+        raise NotImplementedError
+
+    def finish(self):
+        self.transitioning = False
+
+    def check_for_transition_complete(self):
+        if not self.scheduler.is_active(self):
+            self.transitioning = False
+
+    def is_transitioning(self):
+        return self.transitioning
 
+    def get_progress(self):
+        return self.progress
 
-        # TODO - pass this through via the constructor so we can modify it to be any number
-        rect_count = 3
+
+class HorizontalRectangleSwipeTransition(Transition):
+    """ Horizontal bands covering the window slide out alternately to the right and left """
+
+    def __init__(self, rect_count=3, speed=300, easing=linear, duration=None, color=(255, 255, 255), size=None, scheduler=None):
+        width, height = size or pygame.display.get_window_size()
+        # band 0 has left the window once it has travelled width + 1 pixels
+        self.travel = width + 1
+        self.speed = speed
+        Transition.__init__(self, duration or self.travel / speed, easing, (width, height), scheduler)
+
+        self.image = pygame.Surface((self.width, self.height), pygame.SRCALPHA).convert_alpha()
+        self.rect = self.image.get_rect()
+        self.color = color
 
         self.rectangles = [ ]
         division = self.height // rect_count
@@ -30,27 +80,122 @@ class HorizontalRectangleSwipeTransition(pygame.sprite.Sprite):
                 pygame.Rect(0, division * (i ), self.width, division)
             )
 
-        self.to_the_right_x = 0
-        self.to_the_left_x = 0
+        for rect in self.rectangles:
+            self.image.fill(self.color, rect)
 
-    def update(self, dt):
-        self.image.fill((0,0,0,0))
-        self.to_the_left_x -= self.speed * dt
-        self.to_the_right_x += self.speed * dt
+    def render(self, progress):
+        offset = round(progress * self.travel)
 
         for i, rect in enumerate(self.rectangles):
-            pygame.draw.rect(self.image,(255, 255, 255), rect)
-
-            if i % 2  == 0:
-                rect.move_ip(self.to_the_right_x, 0)
+            x = offset if i % 2 == 0 else -offset
+            if rect.x == x:
+                continue
+            # only the strips a band uncovered and newly covered change
+            old = rect.copy()
+            rect.x = x
+            if not old.colliderect(rect):
+                self.image.fill((0, 0, 0, 0), old)
+                self.image.fill(self.color, rect)
+            elif x > old.x:
+                self.image.fill((0, 0, 0, 0), (old.x, old.y, x - old.x, old.h))
+                self.image.fill(self.color, (old.right, old.y, x - old.x, old.h))
             else:
-                rect.move_ip(self.to_the_left_x, 0)
+                self.image.fill((0, 0, 0, 0), (rect.right, old.y, old.x - x, old.h))
+                self.image.fill(self.color, (x, old.y, old.x - x, old.h))
+            self.dirty = True
 
-        self.check_for_transition_complete()
 
-    def check_for_transition_complete(self):
-        if self.rectangles[0].left > self.width:
-            self.transitioning = False
+class CrossfadeTransition(Transition):
+    """ Blend from a snapshot of the outgoing screen to a snapshot of the incoming one """
 
-    def is_transitioning(self):
-        return self.transitioning
+    def __init__(self, outgoing, incoming, duration=0.5, easing=linear, scheduler=None):
+        Transition.__init__(self, duration, easing, outgoing.get_size(), scheduler)
+
+        self.outgoing = outgoing.convert()
+        self.incoming = incoming.convert()
+        self.image = self.outgoing.copy()
+        self.rect = self.image.get_rect()
+        self.level = 0
+
+        if numpy is not None and self.image.get_bytesize() == 4:
+            # split packed 32 bit pixels into two lanes of alternating bytes (0x00FF00FF) so each
+            # lane can be blended as (out * (256 - a) + in * a) >> 8 without overflowing into its neighbour
+            outgoing_pixels = pygame.surfarray.pixels2d(self.outgoing).T.copy()
+            incoming_pixels = pygame.surfarray.pixels2d(self.incoming).T.copy()
+            self.lane_mask = numpy.uint32(0x00FF00FF)
+            self.outgoing_lanes = (outgoing_pixels & self.lane_mask, (outgoing_pixels >> 8) & self.lane_mask)
+            self.incoming_lanes = (incoming_pixels & self.lane_mask, (incoming_pixels >> 8) & self.lane_mask)
+            self.blend_buffers = (numpy.empty_like(outgoing_pixels), numpy.empty_like(outgoing_pixels), numpy.empty_like(outgoing_pixels))
+        else:
+            self.outgoing_lanes = None
+
+    def render(self, progress):
+        level = round(progress * 256)
+        if level == self.level:
+            return
+        self.level = level
+
+        if self.outgoing_lanes is None:
+            self.image.blit(self.outgoing, (0, 0))
+            self.incoming.set_alpha(min(level, 255))
+            self.image.blit(self.incoming, (0, 0))
+            self.dirty = True
+            return
+
+        low, high, scratch = self.blend_buffers
+        for lane, out_lane, in_lane in ((low, self.outgoing_lanes[0], self.incoming_lanes[0]),
+                                        (high, self.outgoing_lanes[1], self.incoming_lanes[1])):
+            numpy.multiply(out_lane, numpy.uint32(256 - level), out=lane)
+            numpy.multiply(in_lane, numpy.uint32(level), out=scratch)
+            numpy.add(lane, scratch, out=lane)
+        numpy.right_shift(low, 8, out=low)
+        numpy.bitwise_and(low, self.lane_mask, out=low)
+        numpy.bitwise_and(high, numpy.uint32(0xFF00FF00), out=high)
+        numpy.bitwise_or(low, high, out=low)
+
+        target = pygame.surfarray.pixels2d(self.image).T
+        target[...] = low
+        del target
+        self.dirty = True
+
+
+class DissolveTransition(Transition):
+    """ Replace outgoing screen pixels with incoming ones in a fixed random order """
+
+    def __init__(self, outgoing, incoming, duration=0.75, easing=linear, seed=None, scheduler=None):
+        if numpy is None:
+            raise ImportError('DissolveTransition requires numpy')
+        Transition.__init__(self, duration, easing, outgoing.get_size(), scheduler)
+
+        self.incoming = incoming.convert()
+        self.image = outgoing.convert()
+        self.rect = self.image.get_rect()
+
+        # bucket pixels by a random threshold once, each frame only copies the buckets crossed since the last one
+        thresholds = numpy.random.default_rng(seed).integers(0, 256, self.width * self.height, dtype=numpy.uint8)
+        order = numpy.argsort(thresholds, kind='stable')
+        self.pixel_x, self.pixel_y = numpy.divmod(order, self.height)
+        self.bucket_ends = numpy.cumsum(numpy.bincount(thresholds, minlength=256))
+        self.level = 0
+
+    def render(self, progress):
+        level = round(progress * 256)
+        if level <= self.level:
+            return
+        start = self.bucket_ends[self.level - 1] if self.level else 0
+        end = self.bucket_ends[level - 1]
+        self.level = level
+        if start == end:
+            return
+
+        xs, ys = self.pixel_x[start:end], self.pixel_y[start:end]
+        target = pygame.surfarray.pixels2d(self.image)
+        source = pygame.surfarray.pixels2d(self.incoming)
+        target[xs, ys] = source[xs, ys]
+        del target, source
+        self.dirty = True
+
+
+def snapshot(surface=None):
+    """ Return copy of surface (the display surface by default) to use as a transition endpoint """
+    return (surface or pygame.display.get_surface()).copy()